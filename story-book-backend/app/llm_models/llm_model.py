@@ -1,21 +1,118 @@
 import os
+import time
+import hashlib
+import threading
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 
 load_dotenv()
 
 # Default LLM instance using environment variable
 llm = ChatOpenAI(model="gpt-4o", temperature=0.7)
 
+# Pooled clients are dropped after this many idle seconds, and at most this many are kept
+LLM_CLIENT_TTL_SECONDS = float(os.getenv("LLM_CLIENT_TTL_SECONDS", "900"))
+LLM_CLIENT_POOL_SIZE = int(os.getenv("LLM_CLIENT_POOL_SIZE", "64"))
 
-def get_llm_with_api_key(api_key: Optional[str] = None) -> Optional[ChatOpenAI]:
+
+class PooledLLM:
+    """A pooled ChatOpenAI client plus runnables (chains) built on top of it."""
+
+    def __init__(self, llm: ChatOpenAI):
+        self.llm = llm
+        self.runnables: Dict[str, Any] = {}
+        self.last_used = time.monotonic()
+
+
+class LLMClientPool:
     """
-    Get LLM instance with provided API key or from environment.
-    
+    Reuse ChatOpenAI clients (and their HTTP connection pools) across requests.
+
+    Clients are keyed by a hash of the API key, so raw keys are never held as
+    dict keys, and evicted after LLM_CLIENT_TTL_SECONDS without use or when the
+    pool exceeds LLM_CLIENT_POOL_SIZE (least recently used first).
+    """
+
+    def __init__(self, ttl_seconds: float = LLM_CLIENT_TTL_SECONDS, max_size: int = LLM_CLIENT_POOL_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: Dict[str, PooledLLM] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(api_key: Optional[str]) -> str:
+        """Pool key for an API key; the environment key shares one entry."""
+        if not api_key:
+            return "env"
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    def get(self, api_key: Optional[str] = None) -> Optional[PooledLLM]:
+        """
+        Return the pooled client for an API key, creating it on first use.
+
+        Args:
+            api_key: Optional OpenAI API key from frontend; None uses the environment key
+
+        Returns:
+            PooledLLM entry or None if no valid API key is available
+        """
+        key = self.key_for(api_key)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry:
+                entry.last_used = now
+                return entry
+
+        client = create_llm(api_key)
+        if client is None:
+            return None
+
+        with self._lock:
+            # Another request may have created the client meanwhile; keep the first one
+            entry = self._entries.setdefault(key, PooledLLM(client))
+            entry.last_used = now
+            self._evict(now)
+            return entry
+
+    def get_runnable(self, api_key: Optional[str], name: str, build: Callable[[ChatOpenAI], Any]) -> Optional[Any]:
+        """
+        Return a runnable built from the pooled client, building it once per client.
+
+        Args:
+            api_key: Optional OpenAI API key from frontend
+            name: Name of the runnable, unique per kind of chain
+            build: Function composing the runnable from the ChatOpenAI client
+
+        Returns:
+            The cached runnable, or None if no valid API key is available
+        """
+        entry = self.get(api_key)
+        if entry is None:
+            return None
+        runnable = entry.runnables.get(name)
+        if runnable is None:
+            runnable = entry.runnables.setdefault(name, build(entry.llm))
+        return runnable
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the least recently used ones over max_size. Caller holds the lock."""
+        for key in [k for k, e in self._entries.items() if now - e.last_used > self.ttl_seconds]:
+            del self._entries[key]
+        while len(self._entries) > self.max_size:
+            oldest = min(self._entries, key=lambda k: self._entries[k].last_used)
+            del self._entries[oldest]
+
+
+def create_llm(api_key: Optional[str] = None) -> Optional[ChatOpenAI]:
+    """
+    Create a new LLM instance with provided API key or from environment.
+
     Args:
         api_key: Optional OpenAI API key from frontend
-        
+
     Returns:
         ChatOpenAI instance or None if no valid API key
     """
@@ -30,7 +127,7 @@ def get_llm_with_api_key(api_key: Optional[str] = None) -> Optional[ChatOpenAI]:
         elif os.getenv("OPENAI_API_KEY"):
             # Use environment variable
             return ChatOpenAI(
-                model="gpt-4o", 
+                model="gpt-4o",
                 temperature=0.7
             )
         else:
@@ -38,4 +135,24 @@ def get_llm_with_api_key(api_key: Optional[str] = None) -> Optional[ChatOpenAI]:
             return None
     except Exception as e:
         print(f"Failed to initialize LLM: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+# Process-wide client pool
+llm_client_pool = LLMClientPool()
+
+
+def get_llm_with_api_key(api_key: Optional[str] = None) -> Optional[ChatOpenAI]:
+    """
+    Get LLM instance with provided API key or from environment.
+    Instances come from the shared client pool, so repeated calls with the
+    same key reuse one client and its connections.
+
+    Args:
+        api_key: Optional OpenAI API key from frontend
+
+    Returns:
+        ChatOpenAI instance or None if no valid API key
+    """
+    entry = llm_client_pool.get(api_key)
+    return entry.llm if entry else None
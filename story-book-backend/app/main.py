@@ -1,9 +1,16 @@
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.storybook.routers import router as storybook_router
 from dotenv import load_dotenv
 from fastapi.staticfiles import StaticFiles
+from app.storybook.asset_store import asset_store, ImmutableStaticFiles
+from app.storybook.compression import CompressionMiddleware
+from app.storybook.pdf_workers import pdf_extraction_service
+from app.storybook.sample_catalog import sample_catalog
+from app.storybook.pdf_uploads import pdf_upload_store
+from app.storybook.illustration_jobs import illustration_job_queue
 
 load_dotenv()
 
@@ -11,6 +18,8 @@ app = FastAPI(
     title="Child Story Book API",
     description="API for Child Story Book",
     version="0.1.0",
+    # Story books and pdf-data payloads run to megabytes; orjson encodes them several times faster
+    default_response_class=ORJSONResponse,
 )
 
 # Allow CORS for all origins
@@ -26,13 +35,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiated zstd/br/gzip for JSON bodies; streamed and file responses pass through
+app.add_middleware(CompressionMiddleware)
+
 app.get("/")(lambda: {"message": "Child Story Book API is running!"})
 
-app.mount("/static/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/static/uploads", StaticFiles(directory=str(pdf_upload_store.upload_dir)), name="uploads")
 app.mount("/static/sample", StaticFiles(directory="sample"), name="sample")
+app.mount("/static/assets", ImmutableStaticFiles(directory=str(asset_store.root)), name="assets")
 
 app.include_router(storybook_router)
 
+# Build the sample catalog index before serving requests
+app.add_event_handler("startup", sample_catalog.refresh)
+
+# Resume illustration jobs interrupted by a restart, and stop their workers on shutdown
+app.add_event_handler("startup", illustration_job_queue.start)
+app.add_event_handler("shutdown", illustration_job_queue.stop)
+
+# Stop PDF worker processes with the server
+app.add_event_handler("shutdown", pdf_extraction_service.shutdown)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app)
@@ -0,0 +1,146 @@
+import os
+import base64
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from fastapi.staticfiles import StaticFiles
+
+from app.storybook.atomic_files import atomic_open, atomic_write, temp_path
+from app.storybook.pdf_cache import file_sha256
+
+
+# Content-addressed files never change, so browsers and CDNs may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+MEDIA_TYPE_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/webp": "webp",
+    "image/avif": "avif",
+}
+
+
+def write_base64_file(data: str, path: Path, chunk_chars: int = 1024 * 1024) -> str:
+    """
+    Decode base64 text into a file a chunk at a time, hashing it on the way.
+    The file is written to a temp name and renamed, so readers never see a partial file.
+
+    Args:
+        data: Base64 encoded content (no line breaks)
+        path: Destination file
+        chunk_chars: Characters decoded per iteration; rounded down to a multiple of 4
+
+    Returns:
+        Hex encoded SHA-256 digest of the decoded content
+    """
+    chunk_chars -= chunk_chars % 4
+    digest = hashlib.sha256()
+    with atomic_open(path, "wb") as handle:
+        for start in range(0, len(data), chunk_chars):
+            chunk = base64.b64decode(data[start:start + chunk_chars])
+            digest.update(chunk)
+            handle.write(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    """
+    Place source at target as a hard link (no extra disk space), copying across filesystems.
+    Replaces target atomically.
+    """
+    tmp_path = temp_path(target)
+    try:
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class AssetStore:
+    """
+    Content-addressed store for assets such as PDF page images and generated illustrations.
+
+    Each asset is written once under its SHA-256 digest and exposed through
+    a static URL, so identical images across books share one file.
+    """
+
+    def __init__(self, root_dir: Optional[str] = None, url_prefix: str = "/static/assets"):
+        self.root = Path(root_dir or os.getenv("ASSET_DIR", "assets"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def relative_path(self, digest: str, extension: str) -> str:
+        """Relative location of an asset, sharded by digest prefix to keep directories small."""
+        return f"{digest[:2]}/{digest}.{extension}"
+
+    def put(self, data: bytes, media_type: str = "image/png") -> str:
+        """
+        Store bytes in the asset store if not already present.
+
+        Args:
+            data: Raw asset bytes
+            media_type: MIME type used to pick the file extension
+
+        Returns:
+            Public URL of the stored asset
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        extension = MEDIA_TYPE_EXTENSIONS.get(media_type, "bin")
+        relative = self.relative_path(digest, extension)
+        target = self.root / relative
+
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(target, data)
+
+        return f"{self.url_prefix}/{relative}"
+
+    def put_file(self, path: Path, media_type: str = "image/png") -> str:
+        """
+        Store a file in the asset store if not already present, without reading it into memory.
+
+        Args:
+            path: File to store; it is hard-linked when possible
+            media_type: MIME type used to pick the file extension
+
+        Returns:
+            Public URL of the stored asset
+        """
+        extension = MEDIA_TYPE_EXTENSIONS.get(media_type, "bin")
+        relative = self.relative_path(file_sha256(path), extension)
+        target = self.root / relative
+
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            link_or_copy(Path(path), target)
+
+        return f"{self.url_prefix}/{relative}"
+
+    def path_for_url(self, url: str) -> Optional[Path]:
+        """Local file behind a URL returned by put(), or None for URLs outside the store."""
+        if not url.startswith(self.url_prefix + "/"):
+            return None
+        return self.root / url[len(self.url_prefix) + 1:]
+
+    def exists(self, url: str) -> bool:
+        """Check whether the asset behind a URL returned by put() is still on disk."""
+        path = self.path_for_url(url)
+        return path is not None and path.exists()
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles mount that marks every response as immutable for long-term caching."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+
+# Process-wide asset store shared by the extraction endpoints and the illustrator
+asset_store = AssetStore()
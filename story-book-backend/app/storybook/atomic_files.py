@@ -0,0 +1,49 @@
+import os
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Union
+
+
+def temp_path(path: Path) -> Path:
+    """Unique hidden temp file next to path, so the final rename stays on one filesystem."""
+    path = Path(path)
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+
+@contextmanager
+def atomic_open(path: Path, mode: str = "wb", encoding: str = None) -> Iterator[IO]:
+    """
+    Open a temp file for writing and rename it over path once the block succeeds,
+    so readers only ever see the old file or the complete new one. The temp file
+    is removed if the block raises.
+
+    Args:
+        path: Destination file
+        mode: Write mode, "wb" or "w"
+        encoding: Text encoding, for mode "w"
+    """
+    path = Path(path)
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, mode, encoding=encoding) as handle:
+            yield handle
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def atomic_write(path: Path, data: Union[bytes, str]) -> None:
+    """
+    Replace a file's content atomically.
+
+    Args:
+        path: Destination file
+        data: Bytes, or text written as UTF-8
+    """
+    if isinstance(data, str):
+        with atomic_open(path, "w", encoding="utf-8") as handle:
+            handle.write(data)
+    else:
+        with atomic_open(path, "wb") as handle:
+            handle.write(data)
@@ -0,0 +1,157 @@
+import os
+import gzip
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import zstandard
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it br is simply never negotiated
+    brotli = None
+
+
+@dataclass
+class CompressionConfig:
+    """Configuration for negotiated response compression."""
+    minimum_size: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+    # Bodies larger than this are compressed on the thread pool instead of the event loop
+    threadpool_size: int = int(os.getenv("RESPONSE_COMPRESSION_THREADPOOL_BYTES", "262144"))
+    gzip_level: int = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+    brotli_quality: int = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))
+    zstd_level: int = int(os.getenv("RESPONSE_ZSTD_LEVEL", "3"))
+    media_types: Tuple[str, ...] = field(default=("application/json", "text/plain", "text/html"))
+
+
+def gzip_compress(body: bytes, config: CompressionConfig) -> bytes:
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=config.gzip_level, mtime=0)
+
+
+def brotli_compress(body: bytes, config: CompressionConfig) -> bytes:
+    return brotli.compress(body, quality=config.brotli_quality)
+
+
+def zstd_compress(body: bytes, config: CompressionConfig) -> bytes:
+    return zstandard.ZstdCompressor(level=config.zstd_level).compress(body)
+
+
+def available_encoders() -> Dict[str, Callable[[bytes, CompressionConfig], bytes]]:
+    """Return the supported content codings, in server preference order (best ratio per CPU first)."""
+    encoders = {"zstd": zstd_compress}
+    if brotli is not None:
+        encoders["br"] = brotli_compress
+    encoders["gzip"] = gzip_compress
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    Pick the content coding for a request from its Accept-Encoding header.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+        encodings: Supported codings in server preference order
+
+    Returns:
+        The coding with the highest client q-value (ties broken by server
+        preference), or None to send the body as-is
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON responses with zstd, br or gzip,
+    whichever the client accepts (Starlette's GZipMiddleware only does gzip).
+
+    Only complete bodies are compressed: StreamingResponse and FileResponse
+    send more than one body message and pass through untouched, so NDJSON/SSE
+    events are not held back in a compressor buffer and images (already
+    compressed) aren't compressed twice. Large bodies are compressed on the
+    thread pool so a multi-megabyte pdf-data payload doesn't stall the loop.
+    """
+
+    def __init__(self, app, config: Optional[CompressionConfig] = None):
+        self.app = app
+        self.config = config or CompressionConfig()
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), list(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                # Hold the headers until the body shows whether compression applies
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if not self._should_compress(headers, body, message.get("more_body", False)):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compress = self.encoders[encoding]
+            if len(body) > self.config.threadpool_size:
+                body = await run_in_threadpool(compress, body, self.config)
+            else:
+                body = compress(body, self.config)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if more_body or len(body) < self.config.minimum_size or "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type in self.config.media_types
@@ -0,0 +1,176 @@
+import os
+import json
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.storybook.pdf_cache import FileHashMemo
+from app.storybook.asset_store import write_base64_file
+
+
+# Bump when generation changes should invalidate previously cached images
+ILLUSTRATION_CACHE_VERSION = "1"
+
+
+@dataclass
+class IllustrationCacheConfig:
+    """Configuration for the illustration cache."""
+    cache_dir: str = os.getenv("ILLUSTRATION_CACHE_DIR", "cache/illustrations")
+    max_disk_bytes: int = int(os.getenv("ILLUSTRATION_CACHE_MAX_DISK_MB", "2048")) * 1024 * 1024
+
+
+class IllustrationCache:
+    """
+    Content-addressed disk cache of generated images.
+
+    Entries are keyed by a hash of everything that determines the image:
+    model, size, quality, illustration style, prompt and the content hashes
+    of any reference images. Identical requests from any book, retry or
+    re-render are served from disk instead of paying for a new image.
+    The cache is evicted least recently used first once it exceeds its
+    byte budget.
+    """
+
+    def __init__(self, config: Optional[IllustrationCacheConfig] = None):
+        self.config = config or IllustrationCacheConfig()
+        self.cache_dir = Path(self.config.cache_dir)
+        self._hashes = FileHashMemo()
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def reference_hash(self, path: Path) -> str:
+        """Return the content hash of a reference image, re-hashing only when it changed on disk."""
+        return self._hashes.get(path)
+
+    def cache_key(
+        self,
+        model: str,
+        size: str,
+        quality: str,
+        illustration_style: str,
+        prompt: str,
+        references: Optional[List[Path]] = None,
+    ) -> str:
+        """
+        Build the cache key for one image request.
+
+        Args:
+            model: Image model name
+            size: Requested image size
+            quality: Requested image quality
+            illustration_style: Story illustration style
+            prompt: Illustration description
+            references: Reference image paths; their content, not their path, is keyed
+
+        Returns:
+            Hex encoded SHA-256 cache key
+        """
+        fields = {
+            "version": ILLUSTRATION_CACHE_VERSION,
+            "model": model,
+            "size": size,
+            "quality": quality,
+            "illustration_style": illustration_style,
+            "prompt": prompt.strip(),
+            "references": [self.reference_hash(path) for path in references or ()],
+        }
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.png"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Look up a cached image.
+
+        Args:
+            key: Cache key from cache_key()
+
+        Returns:
+            Path of the cached image or None on a miss
+        """
+        path = self.path_for(key)
+        try:
+            # Refresh the access time used for LRU eviction
+            os.utime(path, None)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put_base64(self, key: str, image_base64: str) -> Path:
+        """
+        Store a base64 encoded image, decoding it straight to disk.
+
+        Args:
+            key: Cache key from cache_key()
+            image_base64: Image as returned by the images API
+
+        Returns:
+            Path of the cached image
+        """
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_base64_file(image_base64, path)
+        size = path.stat().st_size
+
+        with self._lock:
+            self.stores += 1
+            if self._size is not None:
+                self._size += size
+            over_budget = self._size is None or self._size > self.config.max_disk_bytes
+        if over_budget:
+            self._evict()
+        return path
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the cache size on disk."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "disk_bytes": self._size or 0,
+            }
+
+    def _evict(self) -> None:
+        """Recount the cache size and delete least recently used images until it fits its byte budget."""
+        entries = []
+        total = 0
+        for entry in self.cache_dir.glob("*/*.png"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+
+        evicted = 0
+        if total > self.config.max_disk_bytes:
+            for _, size, entry in sorted(entries, key=lambda item: item[0]):
+                entry.unlink(missing_ok=True)
+                total -= size
+                evicted += 1
+                if total <= self.config.max_disk_bytes:
+                    break
+
+        with self._lock:
+            self._size = total
+            self.evictions += evicted
+
+
+# Process-wide cache shared by every illustrator
+illustration_cache = IllustrationCache()
@@ -0,0 +1,257 @@
+import os
+import time
+import uuid
+import sqlite3
+import asyncio
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from app.storybook.schemas import IllustrationJob, StoryBook
+from app.storybook.illustrator import StoryBookIllustrator, IllustrationConfig, IllustrationIncompleteError
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# Jobs submitted with a user's own key never fall back to the server's key
+OWN_KEY_LOST_ERROR = "The API key this job was submitted with is no longer available, please resubmit"
+
+
+class IllustrationJobStore:
+    """SQLite persistence for illustration jobs, so queued and running jobs survive restarts."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS illustration_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    story TEXT NOT NULL,
+                    quality TEXT NOT NULL,
+                    output_dir TEXT NOT NULL,
+                    progress_done INTEGER NOT NULL DEFAULT 0,
+                    progress_total INTEGER NOT NULL DEFAULT 0,
+                    message TEXT NOT NULL DEFAULT '',
+                    error TEXT,
+                    result TEXT,
+                    uses_own_key INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            # Databases created before uses_own_key existed
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(illustration_jobs)")}
+            if "uses_own_key" not in columns:
+                conn.execute("ALTER TABLE illustration_jobs ADD COLUMN uses_own_key INTEGER NOT NULL DEFAULT 0")
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the store safe to use from worker and request threads
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def create(self, job_id: str, story: StoryBook, quality: str, output_dir: str, uses_own_key: bool = False) -> None:
+        now = time.time()
+        total = len(story.story_characters) + len(story.story_book)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO illustration_jobs
+                    (job_id, status, story, quality, output_dir, progress_total, uses_own_key, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, JOB_QUEUED, story.model_dump_json(), quality, output_dir, total, int(uses_own_key), now, now),
+            )
+
+    def update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"UPDATE illustration_jobs SET {columns} WHERE job_id = ?",
+                (*fields.values(), job_id),
+            )
+
+    def get_row(self, job_id: str) -> Optional[sqlite3.Row]:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT * FROM illustration_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+
+    def unfinished(self) -> list:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT * FROM illustration_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JOB_QUEUED, JOB_RUNNING),
+            ).fetchall()
+
+
+class IllustrationJobQueue:
+    """
+    Run full storybook illustration as background tasks on the server's event loop.
+
+    Jobs are persisted in SQLite with their progress and result. On startup,
+    jobs left queued or running by a previous process are re-queued; the
+    illustrator skips illustrations already on disk in the job's output
+    directory, so a resumed job continues rather than starting over.
+    At most max_workers jobs illustrate at once; their image requests share the
+    process-wide image rate limiter.
+    User-supplied API keys are kept in memory only and jobs are flagged as
+    using one, so on resume those jobs fail and ask to be resubmitted rather
+    than running on (and billing) the server's own OPENAI_API_KEY.
+    A job in which any character or page failed ends as failed, with the
+    failed items in its error and the partly illustrated story as its result.
+    Resumption assumes one server process owns the jobs database.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_workers: Optional[int] = None):
+        self.store = IllustrationJobStore(db_path or os.getenv("ILLUSTRATION_JOBS_DB", "data/illustration_jobs.sqlite3"))
+        self.max_workers = max_workers or int(os.getenv("ILLUSTRATION_JOB_WORKERS", "2"))
+        self.output_root = Path(os.getenv("ILLUSTRATION_JOBS_DIR", "openai/story_illustrations"))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._api_keys: Dict[str, str] = {}
+
+    async def start(self) -> None:
+        """Start running jobs and resume those interrupted by a restart."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        for row in await asyncio.to_thread(self.store.unfinished):
+            if row["uses_own_key"] and row["job_id"] not in self._api_keys:
+                print(f"Not resuming illustration job {row['job_id']}: its API key is gone")
+                await asyncio.to_thread(self.store.update, row["job_id"], status=JOB_FAILED, error=OWN_KEY_LOST_ERROR)
+                continue
+            print(f"Resuming illustration job {row['job_id']}")
+            await asyncio.to_thread(self.store.update, row["job_id"], status=JOB_QUEUED, message="Resumed after restart")
+            self._spawn(row["job_id"])
+
+    async def stop(self) -> None:
+        """Cancel running jobs; they are resumed on next start."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._semaphore = None
+
+    def _spawn(self, job_id: str) -> None:
+        task = asyncio.ensure_future(self._run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def submit(self, story: StoryBook, quality: str = "medium", api_key: Optional[str] = None) -> str:
+        """
+        Queue a story for illustration.
+
+        Args:
+            story: Story to illustrate
+            quality: Image quality passed to the images API
+            api_key: Optional OpenAI API key for this job only
+
+        Returns:
+            The new job ID
+        """
+        if self._semaphore is None:
+            await self.start()
+        job_id = uuid.uuid4().hex
+        output_dir = str(self.output_root / job_id)
+        await asyncio.to_thread(self.store.create, job_id, story, quality, output_dir, bool(api_key))
+        if api_key:
+            self._api_keys[job_id] = api_key
+        self._spawn(job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[IllustrationJob]:
+        """Return the current state of a job, or None if it doesn't exist."""
+        row = self.store.get_row(job_id)
+        if row is None:
+            return None
+        return IllustrationJob(
+            job_id=row["job_id"],
+            status=row["status"],
+            progress_done=row["progress_done"],
+            progress_total=row["progress_total"],
+            message=row["message"],
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            result=StoryBook.model_validate_json(row["result"]) if row["result"] else None,
+        )
+
+    async def _run(self, job_id: str) -> None:
+        """Wait for a free job slot, illustrate the job's story and persist the outcome."""
+        async with self._semaphore:
+            await self._illustrate(job_id)
+
+    async def _illustrate(self, job_id: str) -> None:
+        row = await asyncio.to_thread(self.store.get_row, job_id)
+        if row is None or row["status"] not in (JOB_QUEUED, JOB_RUNNING):
+            return
+
+        api_key = self._api_keys.get(job_id)
+        if row["uses_own_key"] and not api_key:
+            await asyncio.to_thread(self.store.update, job_id, status=JOB_FAILED, error=OWN_KEY_LOST_ERROR)
+            return
+        if not api_key and not os.getenv("OPENAI_API_KEY"):
+            await asyncio.to_thread(
+                self.store.update, job_id, status=JOB_FAILED, error="No OpenAI API key available for this job"
+            )
+            return
+
+        await asyncio.to_thread(self.store.update, job_id, status=JOB_RUNNING, progress_done=0, message="Started")
+
+        # Serialize progress writes so they land in order
+        progress_lock = asyncio.Lock()
+
+        async def on_progress(done: int, total: int, message: str) -> None:
+            async with progress_lock:
+                await asyncio.to_thread(
+                    self.store.update, job_id, progress_done=done, progress_total=total, message=message
+                )
+
+        try:
+            config = IllustrationConfig(
+                model="gpt-image-1",
+                character_size="1024x1024",
+                page_size="1024x1024",
+                quality=row["quality"],
+                output_dir=row["output_dir"],
+            )
+            illustrator = StoryBookIllustrator(
+                StoryBook.model_validate_json(row["story"]),
+                config,
+                api_key=api_key,
+                progress_callback=on_progress,
+            )
+            story = await illustrator.generate_all_illustrations(parallel=True, max_workers=3)
+            await asyncio.to_thread(
+                self.store.update, job_id, status=JOB_COMPLETED, result=story.model_dump_json(), message="Completed"
+            )
+        except asyncio.CancelledError:
+            # Server shutdown; the job stays running in the store and resumes on next start
+            raise
+        except IllustrationIncompleteError as e:
+            print(f"Illustration job {job_id} finished with failures: {e}")
+            await asyncio.to_thread(
+                self.store.update,
+                job_id,
+                status=JOB_FAILED,
+                error=str(e),
+                result=e.story_book.model_dump_json(),
+                message=f"{len(e.failed_items)} illustrations failed",
+            )
+        except Exception as e:
+            print(f"Illustration job {job_id} failed: {e}")
+            await asyncio.to_thread(self.store.update, job_id, status=JOB_FAILED, error=str(e))
+        finally:
+            self._api_keys.pop(job_id, None)
+
+
+# Process-wide illustration job queue
+illustration_job_queue = IllustrationJobQueue()
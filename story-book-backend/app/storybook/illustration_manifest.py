@@ -0,0 +1,99 @@
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.storybook.atomic_files import atomic_write
+from app.storybook.pdf_cache import file_sha256
+
+
+ITEM_COMPLETED = "completed"
+ITEM_FAILED = "failed"
+
+
+class IllustrationManifest:
+    """
+    Per-book record of every illustration: the hash of what it was generated
+    from, its status, the checksum of the file written and how long it took.
+
+    Re-running a book consults the manifest instead of trusting that a file
+    exists: an illustration is reused only if it completed, was generated from
+    the same prompt hash and its file still matches the recorded checksum.
+    Missing, failed, truncated and changed illustrations are regenerated.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                self.entries = json.load(handle).get("items", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable illustration manifest {self.path}: {e}")
+
+    def is_current(self, item: str, prompt_hash: str, output_path: Path) -> bool:
+        """
+        Check whether an illustration can be reused.
+
+        Args:
+            item: Manifest key, e.g. "page/3" or "character/Alex"
+            prompt_hash: Hash of everything the illustration is generated from
+            output_path: File the illustration was written to
+
+        Returns:
+            True if the item completed from the same prompt hash and its file is intact
+        """
+        entry = self.entries.get(item)
+        if not entry or entry.get("status") != ITEM_COMPLETED or entry.get("prompt_hash") != prompt_hash:
+            return False
+        try:
+            return file_sha256(output_path) == entry.get("checksum")
+        except OSError:
+            return False
+
+    def record(
+        self,
+        item: str,
+        prompt_hash: str,
+        status: str,
+        started_at: float,
+        output_path: Optional[Path] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record the outcome of one illustration and persist the manifest.
+
+        Args:
+            item: Manifest key, e.g. "page/3" or "character/Alex"
+            prompt_hash: Hash of everything the illustration is generated from
+            status: ITEM_COMPLETED or ITEM_FAILED
+            started_at: time.time() when generation started
+            output_path: File written, for completed items
+            error: Error message, for failed items
+        """
+        finished_at = time.time()
+        entry = {
+            "prompt_hash": prompt_hash,
+            "status": status,
+            "file": str(output_path) if output_path else None,
+            "checksum": file_sha256(output_path) if output_path else None,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "seconds": round(finished_at - started_at, 3),
+            "error": error,
+        }
+        with self._lock:
+            self.entries[item] = entry
+            self._save()
+
+    def _save(self) -> None:
+        """Write the manifest atomically. Caller holds the lock."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.path, json.dumps({"updated_at": time.time(), "items": self.entries}, indent=2))
+        except OSError as e:
+            print(f"Failed to write illustration manifest {self.path}: {e}")
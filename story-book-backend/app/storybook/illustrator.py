@@ -1,16 +1,89 @@
 import os
-import base64
+import time
+import uuid
+import random
+import asyncio
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Union
 from dataclasses import dataclass
-import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor
 
-from openai import OpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from PIL import Image
-import io
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
+from app.llm_models.llm_model import llm_client_pool
 from app.storybook.schemas import StoryBook
+from app.storybook.single_flight import SingleFlight
+from app.storybook.image_rate_limiter import image_rate_limiter
+from app.storybook.illustration_cache import illustration_cache
+from app.storybook.asset_store import asset_store, link_or_copy
+from app.storybook.reference_images import reference_image_cache
+from app.storybook.illustration_manifest import IllustrationManifest, ITEM_COMPLETED, ITEM_FAILED
+
+# Shared by all illustrators in the process so concurrent identical image requests make one API call
+illustration_flight = SingleFlight()
+
+# Retries for rate-limited (429) and transient API errors, and the longest wait between them
+IMAGE_MAX_RETRIES = int(os.getenv("IMAGE_MAX_RETRIES", "5"))
+IMAGE_RETRY_MAX_WAIT_SECONDS = float(os.getenv("IMAGE_RETRY_MAX_WAIT_SECONDS", "60"))
+
+
+class IllustrationAbortedError(Exception):
+    """
+    An error every remaining image of the run would hit too (e.g. the API key has
+    no quota left), so the run stops instead of recording it per item.
+    """
+
+
+class IllustrationIncompleteError(Exception):
+    """
+    Raised at the end of a run in which some characters or pages failed.
+    Carries the failed items (manifest key -> error) and the story book with
+    every illustration that did succeed.
+    """
+
+    def __init__(self, failed_items: Dict[str, str], story_book: StoryBook):
+        self.failed_items = failed_items
+        self.story_book = story_book
+        details = "; ".join(f"{item}: {error}" for item, error in list(failed_items.items())[:5])
+        more = f" (and {len(failed_items) - 5} more)" if len(failed_items) > 5 else ""
+        super().__init__(f"{len(failed_items)} illustrations failed: {details}{more}")
+
+
+async def gather_or_cancel(*aws):
+    """
+    Like asyncio.gather, but if one awaitable raises, cancel the others before
+    re-raising, so a stopped run doesn't keep sending requests in the background.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Read the server's requested wait from an API error's response headers.
+
+    Args:
+        error: Exception raised by the OpenAI client
+
+    Returns:
+        Seconds to wait, or None if the response didn't say
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        if response.headers.get("retry-after-ms"):
+            return float(response.headers["retry-after-ms"]) / 1000
+        if response.headers.get("retry-after"):
+            return float(response.headers["retry-after"])
+    except ValueError:
+        # Retry-After may also be an HTTP date; callers fall back to exponential backoff
+        pass
+    return None
 
 
 @dataclass
@@ -24,25 +97,51 @@ class IllustrationConfig:
 
 
 class StoryBookIllustrator:
-    """A class to generate and manage illustrations for a storybook."""
+    """
+    A class to generate and manage illustrations for a storybook.
+    
+    Runs on the event loop with AsyncOpenAI. Every image request waits for the
+    process-wide image_rate_limiter, which shares each API key's OpenAI rate
+    limits fairly between the books being illustrated with that key.
+    """
     
-    def __init__(self, story_book: StoryBook, config: Optional[IllustrationConfig] = None):
+    def __init__(
+        self,
+        story_book: StoryBook,
+        config: Optional[IllustrationConfig] = None,
+        api_key: Optional[str] = None,
+        progress_callback: Optional[Callable[[int, int, str], Union[None, Awaitable[None]]]] = None,
+    ):
         """
         Initialize the story book illustrator.
         
         Args:
             story_book: StoryBook object containing characters and pages
             config: Configuration for the illustration generation
+            api_key: Optional OpenAI API key; the environment key is used if omitted
+            progress_callback: Optional callable(done, total, message), sync or async,
+                invoked after each character and page illustration is processed
         """
         self.story_book = story_book
         self.config = config or IllustrationConfig()
+        self.progress_callback = progress_callback
+        self.progress_total = len(story_book.story_characters) + len(story_book.story_book)
+        self.progress_done = 0
+        # Manifest key -> error for every character and page that failed in this run
+        self.failed_items: Dict[str, str] = {}
+        # Identifies this book to the rate limiter's fair queueing, and the key whose limits it uses
+        self.book_id = uuid.uuid4().hex
+        self.rate_limit_key = llm_client_pool.key_for(api_key)
         
         # Setup directories
         self.setup_directories()
         
-        # Initialize OpenAI client
+        # What was generated from what, so re-runs only redo missing, failed or changed illustrations
+        self.manifest = IllustrationManifest(self.output_base / "manifest.json")
+        
+        # Initialize OpenAI client; retries are done here so 429s reach the shared limiter
         try:
-            self.client = OpenAI()
+            self.client = AsyncOpenAI(api_key=api_key, max_retries=0) if api_key else AsyncOpenAI(max_retries=0)
         except Exception as e:
             print(f"Failed to initialize OpenAI client: {e}")
             raise
@@ -61,141 +160,220 @@ class StoryBookIllustrator:
         self.pages_dir = self.output_base / "pages"
         self.pages_dir.mkdir(exist_ok=True)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((ConnectionError, TimeoutError))
-    )
-    def generate_image(self, prompt: str, size: str, characters: List[Path] = None) -> Dict:
+    async def report_progress(self, message: str) -> None:
+        """Count one finished character or page and notify the progress callback."""
+        self.progress_done += 1
+        if self.progress_callback:
+            try:
+                result = self.progress_callback(self.progress_done, self.progress_total, message)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                print(f"Progress callback failed: {e}")
+    
+    async def image_key(self, prompt: str, size: str, characters: List[Path] = None) -> str:
+        """
+        Hash everything an image is generated from: model, size, quality, style,
+        prompt and the content of its reference images.
+        """
+        return await asyncio.to_thread(
+            illustration_cache.cache_key,
+            self.config.model,
+            size,
+            self.config.quality,
+            self.story_book.illustration_style,
+            prompt,
+            characters,
+        )
+    
+    async def generate_image(self, prompt: str, size: str, characters: List[Path] = None, cache_key: Optional[str] = None) -> Path:
         """
-        Generate an image using OpenAI's API.
+        Generate an image using OpenAI's API, or reuse an identical one from the illustration cache.
         
         Args:
             prompt: Description for the image generation
             size: Size of the image to generate
             characters: Optional list of character image paths to include
+            cache_key: The image_key() of this request, if the caller already has it
         
         Returns:
-            API response containing the generated image
+            Path of the image in the illustration cache
         """
         try:
+            cache_key = cache_key or await self.image_key(prompt, size, characters)
             prompt = f"""
             Illustration Style: {self.story_book.illustration_style}
             Illustration Description: {prompt}
             """
-            if characters:
-                # Open all character images
-                image_files = [open(str(char_path), "rb") for char_path in characters]
-                result = self.client.images.edit(
-                    model=self.config.model,
-                    prompt=prompt,
-                    size=size,
-                    image=image_files,
-                    quality=self.config.quality,
-                )
-                # Close all opened files
-                for file in image_files:
-                    file.close()
-            else:
-                result = self.client.images.generate(
+            # Concurrent identical requests share one cache lookup and API call; if it fails,
+            # each waiting book retries with its own client (and so its own API key)
+            return await illustration_flight.run(
+                cache_key, lambda: self._generate_cached_image(cache_key, prompt, size, characters)
+            )
+        except Exception as e:
+            print(f"Image generation failed: {e}")
+            raise
+    
+    async def _generate_cached_image(self, cache_key: str, prompt: str, size: str, characters: List[Path] = None) -> Path:
+        """Serve an image from the illustration cache, or request it and decode it into the cache."""
+        cached = await asyncio.to_thread(illustration_cache.get, cache_key)
+        if cached is not None:
+            print(f"Illustration cache hit {cache_key[:12]}")
+            return cached
+        
+        result = await self._request_image(prompt, size, characters)
+        return await asyncio.to_thread(illustration_cache.put_base64, cache_key, result.data[0].b64_json)
+    
+    async def _request_image(self, prompt: str, size: str, characters: List[Path] = None):
+        """
+        Call the OpenAI images API; use generate_image, which caches and coalesces requests.
+        Each attempt waits for the shared rate limiter. A 429 pauses all books on the
+        same API key for its Retry-After (or an exponential backoff), except an
+        exhausted quota, which raises IllustrationAbortedError at once; connection
+        errors, timeouts and 5xx are retried with exponential backoff.
+        """
+        image_files = None
+        if characters:
+            # Downscaled portraits from memory, so each book reads and encodes them once
+            image_files = await asyncio.to_thread(reference_image_cache.get_many, characters)
+        
+        for attempt in range(IMAGE_MAX_RETRIES + 1):
+            await image_rate_limiter.acquire(self.rate_limit_key, self.book_id, images=1)
+            try:
+                if image_files:
+                    return await self.client.images.edit(
+                        model=self.config.model,
+                        prompt=prompt,
+                        size=size,
+                        image=image_files,
+                        quality=self.config.quality,
+                    )
+                return await self.client.images.generate(
                     model=self.config.model,
                     prompt=prompt,
                     size=size,
                     quality=self.config.quality,
                 )
-            return result
-        except Exception as e:
-            print(f"Image generation failed: {e}")
-            raise
+            except (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError) as e:
+                if attempt == IMAGE_MAX_RETRIES:
+                    raise
+                if isinstance(e, RateLimitError) and e.code == "insufficient_quota":
+                    # Out of credit, not throttled: waiting won't help, and every other image
+                    # of this book would fail the same way, so stop the whole run
+                    print("Image request failed: API key has exhausted its quota")
+                    raise IllustrationAbortedError("The OpenAI API key has exhausted its quota") from e
+                delay = min(IMAGE_RETRY_MAX_WAIT_SECONDS, 2 ** attempt + random.random())
+                if isinstance(e, RateLimitError):
+                    retry_after = retry_after_seconds(e)
+                    if retry_after is not None:
+                        delay = min(IMAGE_RETRY_MAX_WAIT_SECONDS, retry_after)
+                    print(f"Image request rate limited, retrying in {delay:.1f}s")
+                    # Rate limits are per API key, so hold back every book using this key
+                    image_rate_limiter.backoff(self.rate_limit_key, delay)
+                else:
+                    print(f"Image request failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
     
-    def save_image(self, image_base64: str, output_path: Path) -> None:
+    def save_image(self, image_path: Path, output_path: Path) -> None:
         """
-        Save an image from API response to a file.
+        Save a generated image into the book's directory.
         
         Args:
-            result: API response containing the image data
+            image_path: Image in the illustration cache, already decoded to disk
             output_path: Path where the image should be saved
         """
         try:
-            image_bytes = base64.b64decode(image_base64)
-            
-            # Process image with PIL before saving
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # Save the image
-            image.save(output_path)
+            # Hard link (or copy) to a temp file and rename, so concurrent writers of the same
+            # path never leave a half-written image that a later exists() check would accept
+            link_or_copy(image_path, output_path)
             print(f"Image saved to {output_path}")
         except Exception as e:
             print(f"Failed to save image: {e}")
             raise
     
-    def generate_character_illustrations(self) -> Dict[str, Path]:
+    async def generate_character_illustrations(self, max_workers: int = 5) -> Dict[str, Path]:
         """
         Generate illustrations for all characters in the story in parallel.
         
+        Args:
+            max_workers: Maximum number of characters in flight for this book
+        
         Returns:
             Dictionary mapping character names to their image paths
         """
         print("Generating character illustrations in parallel...")
         character_paths = {}
+        semaphore = asyncio.Semaphore(max_workers)
         
-        def process_character(character):
-            name = character.character_name
-            description = character.character_description
-            
-            if not name or not description:
-                print(f"Skipping character with missing data: {character}")
-                return name, None
-                
-            print(f"Generating illustration for character: {name}")
-            
-            # Generate safe filename
-            safe_name = "".join(c if c.isalnum() else "_" for c in name)
-            filename = f"{safe_name}.png"
-            output_path = self.characters_dir / filename
-            
-            # Skip if image already exists
-            if output_path.exists():
-                print(f"Using existing illustration for {name}")
-                character.character_image_path = str(output_path)
-                return name, output_path
-                
-            # Generate and save character illustration
-            try:
-                result = self.generate_image(
-                    prompt=description,
-                    size=self.config.character_size
-                )
-                # Get base64 data from response
-                image_base64 = result.data[0].b64_json
-                # Save the image
-                self.save_image(image_base64, output_path)
-                
-                # Update character data with image path
-                character.character_image_path = str(output_path)
-                return name, output_path
-            except Exception as e:
-                print(f"Failed to generate illustration for {name}: {e}")
-                return name, None
-        
-        # Process characters in parallel
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            # Submit all tasks
-            future_to_character = {
-                executor.submit(process_character, character): character
-                for character in self.story_book.story_characters
-            }
-            
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_character):
-                name, path = future.result()
-                if name and path:
-                    character_paths[name] = path
+        async def process_character(character):
+            async with semaphore:
+                name, path = await self.process_character_illustration(character)
+            if name and path:
+                character_paths[name] = path
+            await self.report_progress(f"Character {name} {'done' if path else 'failed'}")
+        
+        await gather_or_cancel(*(process_character(c) for c in self.story_book.story_characters))
         
         print("All character illustrations completed")
         return character_paths
     
-    def process_page_illustration(self, page, page_index: int, character_paths: Dict[str, Path]):
+    async def process_character_illustration(self, character):
+        """
+        Generate (or reuse) the portrait for a single character.
+        
+        Args:
+            character: CharacterDescription to illustrate
+        
+        Returns:
+            Tuple of (character name, image path or None on failure)
+        """
+        name = character.character_name
+        description = character.character_description
+        
+        if not name or not description:
+            print(f"Skipping character with missing data: {character}")
+            return name, None
+        
+        print(f"Generating illustration for character: {name}")
+        
+        # Generate safe filename
+        safe_name = "".join(c if c.isalnum() else "_" for c in name)
+        filename = f"{safe_name}.png"
+        output_path = self.characters_dir / filename
+        
+        item = f"character/{name}"
+        started_at = time.time()
+        prompt_hash = await self.image_key(description, self.config.character_size)
+        
+        # Skip if the manifest shows this exact portrait was already generated intact
+        if await asyncio.to_thread(self.manifest.is_current, item, prompt_hash, output_path):
+            print(f"Using existing illustration for {name}")
+            character.character_image_path = str(output_path)
+            return name, output_path
+        
+        # Generate and save character illustration
+        try:
+            image_path = await self.generate_image(
+                prompt=description,
+                size=self.config.character_size,
+                cache_key=prompt_hash,
+            )
+            # Save the image off the event loop
+            await asyncio.to_thread(self.save_image, image_path, output_path)
+            await asyncio.to_thread(self.manifest.record, item, prompt_hash, ITEM_COMPLETED, started_at, output_path)
+            
+            # Update character data with image path
+            character.character_image_path = str(output_path)
+            return name, output_path
+        except IllustrationAbortedError:
+            raise
+        except Exception as e:
+            print(f"Failed to generate illustration for {name}: {e}")
+            self.failed_items[item] = str(e)
+            await asyncio.to_thread(self.manifest.record, item, prompt_hash, ITEM_FAILED, started_at, error=str(e))
+            return name, None
+    
+    async def process_page_illustration(self, page, page_index: int, character_paths: Dict[str, Path]):
         """
         Process a single page illustration.
         
@@ -203,9 +381,9 @@ class StoryBookIllustrator:
             page: The page data object
             page_index: Index of the page in the storybook
             character_paths: Dictionary mapping character names to their image paths
-            
+        
         Returns:
-            Updated page with illustration path
+            Updated page with illustration path and URL
         """
         page_num = page.page
         description = page.illustration_description
@@ -213,19 +391,13 @@ class StoryBookIllustrator:
         if not description:
             print(f"Skipping page {page_num} with missing description")
             return page
-            
+        
         print(f"Generating illustration for page {page_num}")
         
         # Generate filename for the page
         filename = f"page_{page_num:03d}.png"
         output_path = self.pages_dir / filename
         
-        # Skip if image already exists
-        if output_path.exists():
-            print(f"Using existing illustration for page {page_num}")
-            page.illustration_path = str(output_path)
-            return page
-        
         # Get characters mentioned in this page specifically
         mentioned_characters = []
         if hasattr(page, 'characters'):
@@ -233,102 +405,152 @@ class StoryBookIllustrator:
                 char_name = character.character_name
                 if char_name and char_name in character_paths:
                     mentioned_characters.append(character_paths[char_name])
+        # API might limit number of images
+        mentioned_characters = mentioned_characters[:5]
         
-        # Generate and save page illustration
+        item = f"page/{page_num}"
+        started_at = time.time()
+        prompt_hash = None
         try:
-            # If there are mentioned characters, use them in the image edit
-            if mentioned_characters:
-                result = self.generate_image(
-                    prompt=description,
-                    size=self.config.page_size,
-                    characters=mentioned_characters[:5]  # API might limit number of images
-                )
+            # Covers the description and the referenced portraits, so editing either re-renders the page
+            prompt_hash = await self.image_key(description, self.config.page_size, mentioned_characters)
+            
+            # Skip if the manifest shows this exact page was already generated intact
+            if await asyncio.to_thread(self.manifest.is_current, item, prompt_hash, output_path):
+                print(f"Using existing illustration for page {page_num}")
             else:
-                # Otherwise generate a new image
-                result = self.generate_image(
+                # With mentioned characters this is an image edit, otherwise a new image
+                image_path = await self.generate_image(
                     prompt=description,
-                    size=self.config.page_size
+                    size=self.config.page_size,
+                    characters=mentioned_characters or None,
+                    cache_key=prompt_hash,
                 )
+                
+                # Save the image; pages carry a URL instead of the image data
+                await asyncio.to_thread(self.save_image, image_path, output_path)
+                await asyncio.to_thread(self.manifest.record, item, prompt_hash, ITEM_COMPLETED, started_at, output_path)
             
-            # Get base64 data from response
-            image_base64 = result.data[0].b64_json
-            # Save the image
-            # self.save_image(image_base64, output_path)
-            
-            # Update page data with image path
+            # Update page data with image path and URL
             page.illustration_path = str(output_path)
-            page.illustration_base64 = image_base64
+            page.illustration_url = await asyncio.to_thread(asset_store.put_file, output_path, "image/png")
+            page.illustration_base64 = ""
+        except IllustrationAbortedError:
+            raise
         except Exception as e:
             print(f"Failed to generate illustration for page {page_num}: {e}")
-            
+            self.failed_items[item] = str(e)
+            await asyncio.to_thread(self.manifest.record, item, prompt_hash or "", ITEM_FAILED, started_at, error=str(e))
+        
         return page
     
-    def generate_page_illustrations_parallel(self, character_paths: Dict[str, Path], max_workers: int = 5) -> None:
+    async def generate_illustrations_pipelined(self, max_workers: int = 5) -> Dict[str, Path]:
         """
-        Generate illustrations for all pages in the story in parallel.
+        Generate character and page illustrations together, scheduled by dependency.
+        
+        Each page depends only on the story characters it lists in page.characters:
+        pages without such characters start immediately, the rest start as soon as
+        their last referenced portrait has finished (or failed, in which case the
+        page is drawn without that reference).
         
         Args:
-            character_paths: Dictionary mapping character names to their image paths
-            max_workers: Maximum number of parallel workers
+            max_workers: Maximum number of illustrations in flight for this book
+        
+        Returns:
+            Dictionary mapping character names to their image paths
         """
-        print(f"Generating page illustrations in parallel with {max_workers} workers...")
+        print(f"Generating illustrations pipelined with {max_workers} workers...")
+        character_paths: Dict[str, Path] = {}
+        semaphore = asyncio.Semaphore(max_workers)
         
-        story_pages = self.story_book.story_book
-        total_pages = len(story_pages)
-        
-        print(f"Total pages to process: {total_pages}")
-        
-        # Process pages in parallel
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            futures = []
-            for i, page in enumerate(story_pages):
-                future = executor.submit(
-                    self.process_page_illustration,
-                    page,
-                    i,
-                    character_paths
-                )
-                futures.append(future)
-            
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    print(f"Error processing page: {e}")
-        
-        print("All page illustrations completed")
+        async def process_character(character):
+            async with semaphore:
+                name, path = await self.process_character_illustration(character)
+            if name and path:
+                character_paths[name] = path
+            await self.report_progress(f"Character {name} {'done' if path else 'failed'}")
+        
+        # Characters are started first so their portraits are at the head of the queue
+        character_tasks = {}
+        for character in self.story_book.story_characters:
+            task = asyncio.ensure_future(process_character(character))
+            if character.character_name:
+                character_tasks[character.character_name] = task
+        all_character_tasks = list(character_tasks.values())
+        
+        async def process_page(i, page):
+            deps = {
+                c.character_name for c in getattr(page, "characters", [])
+                if c.character_name in character_tasks
+            }
+            await asyncio.gather(*(character_tasks[name] for name in deps), return_exceptions=True)
+            try:
+                async with semaphore:
+                    # Snapshot the paths so later portraits don't change this page's references
+                    await self.process_page_illustration(page, i, dict(character_paths))
+                await self.report_progress(f"Page {page.page} done")
+            except IllustrationAbortedError:
+                raise
+            except Exception as e:
+                print(f"Error processing page: {e}")
+                await self.report_progress("Page failed")
+        
+        # An IllustrationAbortedError from any item cancels everything still pending
+        await gather_or_cancel(
+            *all_character_tasks,
+            *(process_page(i, page) for i, page in enumerate(self.story_book.story_book)),
+        )
+        
+        print("All illustrations completed")
+        return character_paths
     
-    def generate_all_illustrations(self, parallel: bool = True, max_workers: int = 5) -> StoryBook:
+    async def close(self) -> None:
+        """Close the OpenAI client and its connections."""
+        await self.client.close()
+    
+    async def generate_all_illustrations(self, parallel: bool = True, max_workers: int = 5) -> StoryBook:
         """
-        Generate all illustrations for the storybook.
+        Generate all illustrations for the storybook, then close the OpenAI client;
+        an illustrator does one run.
+        Characters and pages that fail don't stop the run, but are reported at the
+        end by raising IllustrationIncompleteError, so callers never mistake a
+        partly illustrated book for a finished one.
         
         Args:
             parallel: Whether to generate page illustrations in parallel
-            max_workers: Maximum number of parallel workers
-            
+            max_workers: Maximum number of illustrations in flight for this book;
+                the request rate across all books is bounded by image_rate_limiter
+        
         Returns:
             Updated story book with all illustration paths
+        
+        Raises:
+            IllustrationIncompleteError: Some characters or pages failed
+            IllustrationAbortedError: The run was stopped, e.g. the API key is out of quota
         """
         try:
-            # Generate character illustrations first (this is sequential)
-            character_paths = self.generate_character_illustrations()
-            
-            # Then generate page illustrations using character illustrations
             if parallel:
-                self.generate_page_illustrations_parallel(character_paths, max_workers)
+                # Pages start as soon as the characters they reference are ready
+                await self.generate_illustrations_pipelined(max_workers)
             else:
-                self.generate_page_illustrations(character_paths)
+                # Generate character illustrations first, then pages using them
+                character_paths = await self.generate_character_illustrations(max_workers=1)
+                await self.generate_page_illustrations(character_paths)
             
+            print(f"Illustration cache stats: {illustration_cache.stats()}")
+            print(f"Reference image cache stats: {reference_image_cache.stats()}")
+            if self.failed_items:
+                raise IllustrationIncompleteError(dict(self.failed_items), self.story_book)
             print("All illustrations generated successfully")
             return self.story_book
-            
+        
         except Exception as e:
             print(f"Illustration generation failed: {e}")
             raise
+        finally:
+            await self.close()
     
-    def generate_page_illustrations(self, character_paths: Dict[str, Path]) -> None:
+    async def generate_page_illustrations(self, character_paths: Dict[str, Path]) -> None:
         """
         Generate illustrations for all pages in the story sequentially.
         
@@ -340,6 +562,7 @@ class StoryBookIllustrator:
         story_pages = self.story_book.story_book
         
         for i, page in enumerate(story_pages):
-            self.process_page_illustration(page, i, character_paths)
+            await self.process_page_illustration(page, i, character_paths)
+            await self.report_progress(f"Page {page.page} done")
         
-        print("Sequential page illustrations completed")
\ No newline at end of file
+        print("Sequential page illustrations completed")
@@ -0,0 +1,191 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Hashable, Optional, Tuple
+
+
+# OpenAI image limits for this deployment; set them to the organisation's tier
+IMAGE_REQUESTS_PER_MINUTE = float(os.getenv("IMAGE_REQUESTS_PER_MINUTE", "50"))
+IMAGES_PER_MINUTE = float(os.getenv("IMAGES_PER_MINUTE", "50"))
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute, holding at most
+    one minute's worth of tokens. Not thread-safe; used from one event loop.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = max(rate_per_minute, 1.0)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount tokens are available (0 if they already are)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimitLane:
+    """
+    Admission state for one API key: its requests/min and images/min buckets,
+    its 429 pause, and the books waiting on it, admitted round-robin. The
+    dispatcher task runs only while books are waiting.
+    """
+
+    def __init__(self, requests_per_minute: float, images_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.images = TokenBucket(images_per_minute)
+        self.queues: "OrderedDict[Hashable, Deque[Tuple[int, asyncio.Future]]]" = OrderedDict()
+        self.paused_until = 0.0
+        self.wakeup = asyncio.Event()
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.admitted = 0
+        self.throttled = 0
+
+    def idle(self, now: float) -> bool:
+        """True when nothing waits, no pause is pending and both buckets are full again."""
+        return (
+            not self.queues
+            and now >= self.paused_until
+            and self.requests.wait_time(self.requests.capacity, now) == 0
+            and self.images.wait_time(self.images.capacity, now) == 0
+        )
+
+    async def dispatch(self) -> None:
+        """Admit queued requests round-robin across books as tokens become available."""
+        while self.queues:
+            book_id, queue = next(iter(self.queues.items()))
+            images, future = queue[0]
+            if future.cancelled():
+                queue.popleft()
+                self._drop_if_empty(book_id)
+                continue
+
+            now = time.monotonic()
+            delay = max(
+                self.paused_until - now,
+                self.requests.wait_time(1, now),
+                self.images.wait_time(images, now),
+            )
+            if delay > 0:
+                # Sleep until tokens refill, but wake early for a new backoff
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            queue.popleft()
+            self.requests.consume(1)
+            self.images.consume(images)
+            self.admitted += 1
+            future.set_result(None)
+            # Move this book to the back so the next book gets the next slot
+            self.queues.move_to_end(book_id)
+            self._drop_if_empty(book_id)
+
+    def _drop_if_empty(self, book_id: Hashable) -> None:
+        if not self.queues.get(book_id):
+            self.queues.pop(book_id, None)
+
+
+class ImageRateLimiter:
+    """
+    Process-wide admission control for OpenAI image requests.
+
+    OpenAI limits are per API key (organisation), and users can bring their
+    own keys, so each key gets its own lane: every request takes one token
+    from its key's requests/min bucket and one per generated image from its
+    images/min bucket. Within a lane, waiting requests are queued per book and
+    admitted round-robin, so one large book can't starve the others. A 429
+    pauses admission for that key only until its Retry-After has passed;
+    books on other keys are unaffected. Idle lanes are dropped.
+
+    The limiter binds to the event loop it is first used on (the server's).
+    """
+
+    def __init__(self, requests_per_minute: float = IMAGE_REQUESTS_PER_MINUTE, images_per_minute: float = IMAGES_PER_MINUTE):
+        self.requests_per_minute = requests_per_minute
+        self.images_per_minute = images_per_minute
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lanes: Dict[Hashable, RateLimitLane] = {}
+        self.admitted = 0
+        self.throttled = 0
+
+    def _lane(self, key: Hashable) -> RateLimitLane:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or a new loop (e.g. a script calling asyncio.run twice)
+            self._loop = loop
+            self._lanes = {}
+        lane = self._lanes.get(key)
+        if lane is None:
+            self._prune()
+            lane = self._lanes[key] = RateLimitLane(self.requests_per_minute, self.images_per_minute)
+        return lane
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, lane in self._lanes.items() if lane.idle(now)]:
+            lane = self._lanes.pop(key)
+            self.admitted += lane.admitted
+            self.throttled += lane.throttled
+
+    async def acquire(self, key: Hashable, book_id: Hashable, images: int = 1) -> None:
+        """
+        Wait until one request for `images` images may be sent for this book.
+
+        Args:
+            key: Identity of the API key the request is sent with, e.g. llm_client_pool.key_for(api_key)
+            book_id: Identity of the book (or other tenant) the request is for
+            images: Number of images the request will generate
+        """
+        lane = self._lane(key)
+        future = self._loop.create_future()
+        lane.queues.setdefault(book_id, deque()).append((images, future))
+        lane.wakeup.set()
+        if lane.dispatcher is None or lane.dispatcher.done():
+            lane.dispatcher = self._loop.create_task(lane.dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            # A cancelled waiter gives back its slot if it had just been admitted
+            if future.done() and not future.cancelled():
+                lane.requests.tokens += 1
+                lane.images.tokens += min(images, lane.images.capacity)
+            raise
+
+    def backoff(self, key: Hashable, seconds: float) -> None:
+        """Pause admission for every book using one API key, e.g. after a 429 with Retry-After."""
+        lane = self._lane(key)
+        lane.throttled += 1
+        lane.paused_until = max(lane.paused_until, time.monotonic() + seconds)
+        lane.wakeup.set()
+
+    def stats(self) -> Dict[str, float]:
+        lanes = list(self._lanes.values())
+        return {
+            "admitted": self.admitted + sum(lane.admitted for lane in lanes),
+            "throttled": self.throttled + sum(lane.throttled for lane in lanes),
+            "waiting": sum(len(q) for lane in lanes for q in lane.queues.values()),
+            "books": sum(len(lane.queues) for lane in lanes),
+            "keys": len(lanes),
+        }
+
+
+# Process-wide limiter shared by every illustrator
+image_rate_limiter = ImageRateLimiter()
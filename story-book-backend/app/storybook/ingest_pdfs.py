@@ -0,0 +1,110 @@
+# story-book-backend/app/storybook/ingest_pdfs.py
+# Offline ingestion of sample PDFs into prebuilt bundles served by the /sample/* endpoints.
+#
+# Run from story-book-backend/:
+#   python -m app.storybook.ingest_pdfs [sample_dir] [--workers N] [--force]
+
+import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.storybook.pdf_cache import file_sha256
+from app.storybook.pdf_extractor import IMAGE_MODES, extract_pdf_pages, summarize_pdf
+from app.storybook.sample_bundles import SampleBundleStore
+
+
+def ingest_pdf(pdf_path: Path, bundle_dir: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Build the bundle for one PDF; runs in a worker process.
+
+    Args:
+        pdf_path: PDF to ingest
+        bundle_dir: Bundle root, SAMPLE_BUNDLE_DIR by default
+        force: Rebuild even if a current bundle exists
+
+    Returns:
+        Per-file report with page count, timings in seconds and bundle size in bytes
+    """
+    store = SampleBundleStore(bundle_dir)
+    started = time.perf_counter()
+    report: Dict[str, Any] = {"file": pdf_path.name, "skipped": False}
+
+    if not force and store.manifest(pdf_path) is not None:
+        report.update(skipped=True, seconds=time.perf_counter() - started)
+        return report
+
+    sha256 = file_sha256(pdf_path)
+    timings = {"hash": time.perf_counter() - started}
+
+    step = time.perf_counter()
+    summary = summarize_pdf(pdf_path)
+    timings["summary"] = time.perf_counter() - step
+
+    pages = {}
+    for image_mode in IMAGE_MODES:
+        step = time.perf_counter()
+        pages[image_mode] = extract_pdf_pages(pdf_path, image_mode)
+        timings[image_mode] = time.perf_counter() - step
+
+    target = store.write(pdf_path, sha256, summary, pages)
+    report.update(
+        pages=summary["totalPages"],
+        timings=timings,
+        seconds=time.perf_counter() - started,
+        bundleBytes=sum(entry.stat().st_size for entry in target.iterdir()),
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prebuild sample PDF bundles in parallel")
+    parser.add_argument("sample_dir", nargs="?", default="sample")
+    parser.add_argument("--bundle-dir", default=None, help="Bundle root (default: SAMPLE_BUNDLE_DIR or sample/bundles)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="Rebuild bundles that are already current")
+    args = parser.parse_args()
+
+    pdf_paths = sorted(Path(args.sample_dir).glob("*.pdf"))
+    if not pdf_paths:
+        print(f"No PDFs found in {args.sample_dir}")
+        return
+
+    workers = max(1, min(args.workers, len(pdf_paths)))
+    print(f"Ingesting {len(pdf_paths)} PDFs with {workers} workers\n")
+    print(f"{'file':<32} {'pages':>6} {'hash s':>7} {'summary s':>10} {'url s':>7} {'base64 s':>9} {'total s':>8} {'bundle KiB':>11}")
+
+    started = time.perf_counter()
+    failures = 0
+    # Spawned workers match the server's PDF pool and don't inherit fitz state from this process
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {executor.submit(ingest_pdf, path, args.bundle_dir, args.force): path for path in pdf_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"{path.name:<32} failed: {e}")
+                continue
+            if report["skipped"]:
+                print(f"{report['file']:<32} {'up to date':>6}")
+                continue
+            timings = report["timings"]
+            print(
+                f"{report['file']:<32} {report['pages']:>6} {timings['hash']:>7.2f} {timings['summary']:>10.2f} "
+                f"{timings['url']:>7.2f} {timings['base64']:>9.2f} {report['seconds']:>8.2f} "
+                f"{report['bundleBytes'] / 1024:>11.0f}"
+            )
+
+    print(f"\n{len(pdf_paths) - failures}/{len(pdf_paths)} PDFs ingested in {time.perf_counter() - started:.2f}s")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.storybook.atomic_files import atomic_write
+
+
+@dataclass
+class PDFCacheConfig:
+    """Configuration for the PDF extraction cache."""
+    cache_dir: str = os.getenv("PDF_CACHE_DIR", "cache/pdf_extraction")
+    max_memory_bytes: int = int(os.getenv("PDF_CACHE_MAX_MEMORY_MB", "256")) * 1024 * 1024
+    # Larger entries (full base64 extractions of big uploads) are served from disk only
+    max_memory_entry_bytes: int = int(os.getenv("PDF_CACHE_MAX_MEMORY_ENTRY_MB", "32")) * 1024 * 1024
+    max_disk_bytes: int = int(os.getenv("PDF_CACHE_MAX_DISK_MB", "512")) * 1024 * 1024
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Hash a file's content without loading it into memory at once.
+
+    Args:
+        path: File to hash
+        chunk_size: Number of bytes read per iteration
+
+    Returns:
+        Hex encoded SHA-256 digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileHashMemo:
+    """
+    Content hashes of files by path, re-hashed only when a file's mtime or
+    size changes, so repeated lookups of unchanged files don't re-read them.
+    """
+
+    def __init__(self):
+        # (resolved path) -> ((mtime_ns, size), sha256)
+        self._hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> str:
+        """Return the SHA-256 of a file, from the memo while the file is unchanged."""
+        path = Path(path)
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(path.resolve())
+
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        digest = file_sha256(path)
+        with self._lock:
+            self._hashes[key] = (signature, digest)
+        return digest
+
+    def remember(self, path: Path, digest: str) -> None:
+        """Record a hash computed elsewhere (e.g. while streaming the file to disk)."""
+        path = Path(path)
+        stat = path.stat()
+        with self._lock:
+            self._hashes[str(path.resolve())] = ((stat.st_mtime_ns, stat.st_size), digest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hashes.clear()
+
+
+class PDFExtractionCache:
+    """
+    Two-tier (memory + disk) cache for PDF extraction results.
+
+    Entries are keyed by the SHA-256 of the PDF content plus the extractor
+    version, so renamed or re-uploaded copies of the same file share one
+    entry and bumping the extractor version invalidates everything.
+    Both tiers are bounded by the approximate (serialised JSON) size of their
+    entries rather than their count, since one tier holds small summaries next
+    to full base64 extractions of uploads.
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, config: Optional[PDFCacheConfig] = None):
+        self.config = config or PDFCacheConfig()
+        self.cache_dir = Path(self.config.cache_dir)
+        # key -> (value, serialised size in bytes)
+        self._memory: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._hashes = FileHashMemo()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def content_hash(self, pdf_path: Path) -> str:
+        """Return the content hash of a file, re-hashing only when it changed on disk."""
+        return self._hashes.get(pdf_path)
+
+    def remember_content_hash(self, pdf_path: Path, digest: str) -> None:
+        """Record a hash computed elsewhere (e.g. while streaming an upload) so the file isn't re-hashed."""
+        self._hashes.remember(pdf_path, digest)
+
+    def cache_key(self, pdf_path: Path, version: str) -> str:
+        """Build the cache key for a PDF file and extractor version."""
+        return f"{self.content_hash(pdf_path)}-v{version}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value in memory first, then on disk.
+
+        Args:
+            key: Cache key from cache_key()
+
+        Returns:
+            The cached value or None on a miss
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key][0]
+
+        disk_path = self.cache_dir / f"{key}.json"
+        try:
+            with open(disk_path, "r", encoding="utf-8") as handle:
+                value = json.load(handle)
+                size = handle.tell()
+            # Refresh the access time used for disk LRU eviction
+            os.utime(disk_path, None)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Discarding unreadable PDF cache entry {disk_path}: {e}")
+            disk_path.unlink(missing_ok=True)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self._remember(key, value, size)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers.
+
+        Args:
+            key: Cache key from cache_key()
+            value: JSON serialisable extraction result
+        """
+        data = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._remember(key, value, len(data))
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.cache_dir / f"{key}.json", data)
+            self._evict_disk()
+        except OSError as e:
+            print(f"Failed to write PDF cache entry {key}: {e}")
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        self._hashes.clear()
+        if self.cache_dir.exists():
+            for entry in self.cache_dir.glob("*.json"):
+                entry.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current tier sizes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+    def _remember(self, key: str, value: Any, size: int) -> None:
+        """Insert into the memory tier and evict least recently used entries. Caller holds the lock."""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[1]
+        if size > self.config.max_memory_entry_bytes:
+            return
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.config.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used disk entries until the tier fits its byte budget."""
+        entries = []
+        total = 0
+        for entry in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+
+        if total <= self.config.max_disk_bytes:
+            return
+
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            entry.unlink(missing_ok=True)
+            total -= size
+            if total <= self.config.max_disk_bytes:
+                break
+
+
+# Process-wide cache shared by the PDF endpoints
+pdf_extraction_cache = PDFExtractionCache()
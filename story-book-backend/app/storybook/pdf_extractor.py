@@ -0,0 +1,459 @@
+# story-book-backend/app/storybook/pdf_extractor.py
+# PDF text/image extraction. Kept free of FastAPI routing so it can run in worker processes.
+
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from collections import OrderedDict
+from pathlib import Path
+import os
+import base64
+import hashlib
+import threading
+import io
+
+import fitz
+from PIL import Image, features
+
+from app.storybook.asset_store import asset_store
+
+# How extracted page images are returned: inline data URIs or URLs into the asset store
+IMAGE_MODE_BASE64 = "base64"
+IMAGE_MODE_URL = "url"
+IMAGE_MODES = (IMAGE_MODE_BASE64, IMAGE_MODE_URL)
+
+# Bump whenever the shape or content of extracted pages changes so cached results are invalidated
+PDF_EXTRACTOR_VERSION = "4"
+
+# Embedded image formats browsers can display directly, by fitz extension
+PASSTHROUGH_IMAGE_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+}
+
+# Resized copies generated for every image in url mode, by name and maximum width.
+# "full" keeps the original dimensions but in the compact variant format.
+IMAGE_VARIANT_WIDTHS = {
+    "thumbnail": 240,
+    "medium": 800,
+    "full": None,
+}
+# WebP where Pillow was built with it, JPEG otherwise
+VARIANT_FORMAT = "WEBP" if features.check("webp") else "JPEG"
+VARIANT_QUALITY = 80
+
+# Width of the first-page cover rendered for the sample catalog
+COVER_THUMBNAIL_WIDTH = 240
+
+# Page rasterization: output formats, default and allowed resolution
+RENDER_FORMATS = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+}
+if features.check("webp"):
+    RENDER_FORMATS["webp"] = "image/webp"
+RENDER_DEFAULT_DPI = 150
+RENDER_MIN_DPI = 36
+RENDER_MAX_DPI = 300
+# Upper bound on both sides of a rendered page, whatever dpi or width was asked for
+RENDER_MAX_WIDTH = 3000
+RENDER_QUALITY = 85
+
+# Documents each process keeps open for on-demand page access
+PDF_OPEN_DOCUMENTS = int(os.getenv("PDF_OPEN_DOCUMENTS", "8"))
+
+
+class OpenPDFDocument:
+    """An open fitz document plus the url-mode image conversions done for it so far."""
+
+    def __init__(self, doc, signature: Tuple[int, int]):
+        self.doc = doc
+        self.signature = signature
+        # Only url-mode results are small enough to keep for the document's lifetime
+        self.url_image_memo: Dict[Any, Optional[Dict[str, Any]]] = {}
+
+    def image_memo(self, image_mode: str) -> Dict[Any, Optional[Dict[str, Any]]]:
+        return self.url_image_memo if image_mode == IMAGE_MODE_URL else {}
+
+
+class PDFDocumentCache:
+    """
+    Bounded LRU of open PDF documents, so single pages of a large PDF can be
+    extracted on demand without re-opening and re-parsing the file each time.
+
+    Opening is lazy in PyMuPDF: pages are only parsed when loaded, so reading
+    page N costs the same for a 5-page and a 500-page book. Documents are
+    reopened when the file changes on disk. Each process (e.g. each PDF
+    worker) has its own cache; fitz documents must not be used from several
+    threads at once, so callers serialize access with the cache's lock.
+    """
+
+    def __init__(self, max_open: int = PDF_OPEN_DOCUMENTS):
+        self.max_open = max_open
+        self._documents: "OrderedDict[str, OpenPDFDocument]" = OrderedDict()
+        self.lock = threading.RLock()
+
+    def open(self, pdf_path: Path) -> OpenPDFDocument:
+        """Return the open document for a path, opening it (and closing the least recently used) if needed."""
+        stat = os.stat(pdf_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(Path(pdf_path).resolve())
+        with self.lock:
+            entry = self._documents.get(key)
+            if entry is not None and entry.signature == signature:
+                self._documents.move_to_end(key)
+                return entry
+            if entry is not None:
+                entry.doc.close()
+            entry = OpenPDFDocument(fitz.open(str(pdf_path)), signature)
+            self._documents[key] = entry
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.max_open:
+                _, evicted = self._documents.popitem(last=False)
+                evicted.doc.close()
+            return entry
+
+    def close_all(self) -> None:
+        with self.lock:
+            for entry in self._documents.values():
+                entry.doc.close()
+            self._documents.clear()
+
+
+# Per-process cache of open documents for page-level extraction
+pdf_document_cache = PDFDocumentCache()
+
+
+def determine_layout(text: str, images: List[Dict]) -> str:
+    """
+    Determine the best layout based on content.
+    """
+    if not images:
+        return "text-only"
+    if not text or len(text) < 50:
+        return "image-only"
+    
+    # Simple heuristic based on content
+    layouts = ["image-left", "image-right", "image-top", "image-bottom"]
+    return layouts[len(text) % len(layouts)]
+
+
+def get_pdf_page_count(pdf_path: Path) -> int:
+    """
+    Return the number of pages in a PDF without extracting any content.
+    """
+    with pdf_document_cache.lock:
+        return len(pdf_document_cache.open(pdf_path).doc)
+
+
+def summarize_pdf(pdf_path: Path) -> Dict[str, Any]:
+    """
+    Collect catalog metadata for a PDF: page count, embedded title and a
+    thumbnail of the first page stored in the asset store.
+    """
+    with fitz.open(str(pdf_path)) as doc:
+        summary = {
+            "totalPages": len(doc),
+            "metadataTitle": (doc.metadata or {}).get("title") or None,
+            "cover": None,
+        }
+        if len(doc):
+            page = doc.load_page(0)
+            zoom = COVER_THUMBNAIL_WIDTH / page.rect.width
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            summary["cover"] = {
+                "url": asset_store.put(pix.tobytes("png"), "image/png"),
+                "width": pix.width,
+                "height": pix.height,
+            }
+        return summary
+
+
+def render_pdf_page(
+    pdf_path: Path,
+    page_num: int,
+    dpi: Optional[int] = None,
+    width: Optional[int] = None,
+    image_format: str = "png",
+) -> Optional[Dict[str, Any]]:
+    """
+    Rasterize one 0-based page with page.get_pixmap and store it in the asset store.
+    Unlike extraction this keeps vector art, fonts and the page's real layout.
+    
+    Args:
+        pdf_path: PDF file to render
+        page_num: 0-based page index
+        dpi: Resolution; ignored when width is given
+        width: Target width in pixels, overriding dpi
+        
+        Either way the output is scaled down so neither side exceeds RENDER_MAX_WIDTH,
+        so an oversized page in an uploaded PDF can't make get_pixmap allocate gigabytes.
+        image_format: One of RENDER_FORMATS
+    
+    Returns:
+        Dict with url, width and height of the rendered page, or None if the page doesn't exist
+    """
+    with pdf_document_cache.lock:
+        doc = pdf_document_cache.open(pdf_path).doc
+        if not 0 <= page_num < len(doc):
+            return None
+        page = doc.load_page(page_num)
+        if width:
+            zoom = width / page.rect.width
+        else:
+            zoom = (dpi or RENDER_DEFAULT_DPI) / 72
+        zoom = min(zoom, RENDER_MAX_WIDTH / max(page.rect.width, page.rect.height, 1))
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    
+    if image_format == "png":
+        data = pix.tobytes("png")
+    else:
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        buffered = io.BytesIO()
+        image.save(buffered, format=image_format.upper(), quality=RENDER_QUALITY)
+        data = buffered.getvalue()
+    
+    return {
+        "url": asset_store.put(data, RENDER_FORMATS[image_format]),
+        "width": pix.width,
+        "height": pix.height,
+    }
+
+
+def extract_pdf_pages(pdf_path: Path, image_mode: str = IMAGE_MODE_BASE64) -> List[Dict[str, Any]]:
+    """
+    Extract text and images for every page of a PDF file.
+    Raises on unreadable files so failures are never cached.
+    """
+    return list(iter_pdf_pages(pdf_path, image_mode))
+
+
+def iter_pdf_pages(
+    pdf_path: Path,
+    image_mode: str = IMAGE_MODE_BASE64,
+    page_from: int = 1,
+    page_to: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield extracted pages one at a time for a 1-based, inclusive page range.
+    Only the page currently being processed is held in memory, plus the
+    converted form of each distinct image so images reused across pages are
+    converted once.
+    """
+    # Open PDF with PyMuPDF for better image extraction
+    doc = fitz.open(str(pdf_path))
+    image_memo: Dict[Any, Optional[Dict[str, Any]]] = {}
+    
+    try:
+        last_page = len(doc) if page_to is None else min(page_to, len(doc))
+        for page_num in range(page_from - 1, last_page):
+            yield extract_pdf_page(doc, page_num, image_mode, image_memo)
+    finally:
+        doc.close()
+
+
+def encode_pdf_image(doc, xref: int) -> Optional[Tuple[bytes, str, int, int]]:
+    """
+    Get browser-ready bytes for an embedded image.
+    JPEG and PNG streams in GRAY or RGB are returned exactly as stored in the PDF;
+    anything else is decoded once into a Pixmap and encoded to PNG without a PIL round-trip.
+    
+    Returns:
+        Tuple of (bytes, media type, width, height), or None for unsupported (e.g. CMYK) images
+    """
+    info = doc.extract_image(xref)
+    if info and info.get("ext") in PASSTHROUGH_IMAGE_TYPES and info.get("colorspace") in (1, 3) and not info.get("smask"):
+        return info["image"], PASSTHROUGH_IMAGE_TYPES[info["ext"]], info["width"], info["height"]
+    
+    pix = fitz.Pixmap(doc, xref)
+    if pix.n - pix.alpha >= 4:  # CMYK and other colorspaces browsers can't show
+        return None
+    return pix.tobytes("png"), "image/png", pix.width, pix.height
+
+
+def build_image_variants(data: bytes) -> Dict[str, Dict[str, Any]]:
+    """
+    Write thumbnail/medium/full copies of an image to the asset store.
+    Images are never upscaled, so small images get variants at their own size.
+    
+    Returns:
+        Dict mapping variant name to its url, width and height
+    """
+    variants = {}
+    with Image.open(io.BytesIO(data)) as source:
+        source.load()
+        if VARIANT_FORMAT == "JPEG" and source.mode != "RGB":
+            source = source.convert("RGB")
+        elif source.mode not in ("RGB", "RGBA", "L", "LA"):
+            source = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+        
+        for name, max_width in IMAGE_VARIANT_WIDTHS.items():
+            resized = source
+            if max_width and source.width > max_width:
+                height = max(1, round(source.height * max_width / source.width))
+                resized = source.resize((max_width, height), Image.LANCZOS)
+            
+            buffered = io.BytesIO()
+            resized.save(buffered, format=VARIANT_FORMAT, quality=VARIANT_QUALITY)
+            variants[name] = {
+                "url": asset_store.put(buffered.getvalue(), f"image/{VARIANT_FORMAT.lower()}"),
+                "width": resized.width,
+                "height": resized.height,
+            }
+    return variants
+
+
+def convert_pdf_image(
+    doc,
+    xref: int,
+    image_mode: str = IMAGE_MODE_BASE64,
+    image_memo: Optional[Dict[Any, Optional[Dict[str, Any]]]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Convert an embedded image into the fields returned to the frontend.
+    In url mode the image is written once to the asset store and referenced by URL,
+    together with resized "variants"; the URL is also returned under "base64" so
+    existing clients can use it as an img src.
+    
+    Args:
+        doc: Open fitz document
+        xref: Cross-reference number of the image
+        image_mode: IMAGE_MODE_BASE64 or IMAGE_MODE_URL
+        image_memo: Per-document memo keyed by xref and content hash, so an image
+            reused on several pages (or stored under several xrefs) is converted once
+    
+    Returns:
+        Dict with imageId, image source and dimensions, or None for unsupported images
+    """
+    if image_memo is not None and xref in image_memo:
+        return image_memo[xref]
+    
+    converted = None
+    encoded = encode_pdf_image(doc, xref)
+    if encoded is not None:
+        data, media_type, width, height = encoded
+        digest = hashlib.sha256(data).hexdigest()
+        
+        if image_memo is not None and digest in image_memo:
+            converted = image_memo[digest]
+        else:
+            if image_mode == IMAGE_MODE_URL:
+                # Store once in the content-addressed asset store, with resized variants
+                image_url = asset_store.put(data, media_type)
+                converted = {
+                    "imageId": digest[:16],
+                    "url": image_url,
+                    "base64": image_url,
+                    "variants": build_image_variants(data),
+                }
+            else:
+                # Convert to base64 for frontend
+                img_base64 = base64.b64encode(data).decode()
+                converted = {"imageId": digest[:16], "base64": f"data:{media_type};base64,{img_base64}"}
+            converted["width"] = width
+            converted["height"] = height
+            if image_memo is not None:
+                image_memo[digest] = converted
+    
+    if image_memo is not None:
+        image_memo[xref] = converted
+    return converted
+
+
+def extract_pdf_page(
+    doc,
+    page_num: int,
+    image_mode: str = IMAGE_MODE_BASE64,
+    image_memo: Optional[Dict[Any, Optional[Dict[str, Any]]]] = None,
+) -> Dict[str, Any]:
+    """
+    Extract text and images for a single page of an open PDF document.
+    Pass the same image_memo for every page of a document to convert shared images once.
+    """
+    page = doc.load_page(page_num)
+    
+    # Extract text
+    text = page.get_text().strip()
+    
+    # Extract images
+    image_list = page.get_images()
+    page_images = []
+    
+    for img_index, img in enumerate(image_list):
+        try:
+            converted = convert_pdf_image(doc, img[0], image_mode, image_memo)
+            if converted is not None:
+                page_images.append({"index": img_index, **converted})
+            
+        except Exception as e:
+            print(f"Error extracting image {img_index} from page {page_num}: {e}")
+            continue
+    
+    # Create page data
+    return {
+        "id": page_num + 1,
+        "type": "mixed" if text and page_images else ("text" if text else "image"),
+        "content": {
+            "text": text or "No text content on this page.",
+            "images": page_images,
+            "layout": determine_layout(text, page_images)
+        }
+    }
+
+
+def extract_pdf_page_range(
+    pdf_path: Path,
+    image_mode: str = IMAGE_MODE_BASE64,
+    page_from: int = 1,
+    page_to: Optional[int] = None,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Extract a 1-based, inclusive page range in one call, from the cached open
+    document, so only the requested pages are parsed.
+    
+    Returns:
+        Tuple of (total page count of the document, extracted pages)
+    """
+    with pdf_document_cache.lock:
+        entry = pdf_document_cache.open(pdf_path)
+        doc = entry.doc
+        image_memo = entry.image_memo(image_mode)
+        last_page = len(doc) if page_to is None else min(page_to, len(doc))
+        pages_data = [
+            extract_pdf_page(doc, page_num, image_mode, image_memo)
+            for page_num in range(page_from - 1, last_page)
+        ]
+        return len(doc), pages_data
+
+
+def extract_pdf_page_at(pdf_path: Path, page_num: int, image_mode: str = IMAGE_MODE_BASE64) -> Dict[str, Any]:
+    """
+    Extract a single 0-based page from the cached open document; used for per-page jobs when streaming.
+    """
+    with pdf_document_cache.lock:
+        entry = pdf_document_cache.open(pdf_path)
+        return extract_pdf_page(entry.doc, page_num, image_mode, entry.image_memo(image_mode))
+
+
+def dedupe_pdf_images(pdf_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Move image sources into a top-level "images" map keyed by imageId, leaving
+    pages with only imageId references, so an image shared by many pages is
+    sent once. Returns a new dict; the (possibly cached) input is not modified.
+    """
+    images: Dict[str, Any] = {}
+    pages = []
+    for page in pdf_data["pages"]:
+        page_images = []
+        for image in page["content"]["images"]:
+            image_id = image.get("imageId")
+            if not image_id:
+                # Mock data and other sources without ids stay inline
+                page_images.append(image)
+                continue
+            if "variants" in image:
+                images.setdefault(image_id, {"url": image["url"], "variants": image["variants"]})
+            else:
+                images.setdefault(image_id, image["base64"])
+            page_images.append({k: v for k, v in image.items() if k not in ("base64", "url", "variants")})
+        pages.append({**page, "content": {**page["content"], "images": page_images}})
+    
+    return {**pdf_data, "images": images, "pages": pages}
@@ -0,0 +1,178 @@
+import os
+import re
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+# Request.form() returns Starlette's UploadFile, which FastAPI's subclass doesn't match
+from starlette.datastructures import UploadFile
+
+from app.storybook.atomic_files import temp_path
+from app.storybook.pdf_cache import pdf_extraction_cache
+
+
+PDF_MAGIC = b"%PDF-"
+DOCUMENT_ID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Room for the multipart boundaries, part headers and other fields around the PDF itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# The upload endpoint parses its form itself, so describe the body for the API docs
+PDF_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+@dataclass
+class PDFUploadConfig:
+    """Configuration for PDF uploads."""
+    upload_dir: str = os.getenv("UPLOAD_DIR", "uploads")
+    max_bytes: int = int(os.getenv("PDF_UPLOAD_MAX_MB", "200")) * 1024 * 1024
+    chunk_size: int = 1024 * 1024
+
+
+class PDFUploadStore:
+    """
+    Content-addressed storage for uploaded PDFs.
+
+    The size limit is enforced on the request body itself, before multipart
+    parsing spools it to a temp file: a Content-Length over the limit is
+    rejected without reading the body, and a body without one (chunked) is
+    rejected as soon as the bytes received cross the limit. The spooled file
+    is then copied into the store in chunks and hashed on the way. Each PDF
+    is stored once as <sha256>.pdf: the same book uploaded again (under any
+    name) reuses the stored file and its cached extraction, and different
+    books uploaded under the same name no longer overwrite each other.
+    """
+
+    def __init__(self, config: Optional[PDFUploadConfig] = None):
+        self.config = config or PDFUploadConfig()
+        self.upload_dir = Path(self.config.upload_dir)
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+
+    async def save_request(self, request: Request) -> Tuple[Path, str, str]:
+        """
+        Receive a multipart PDF upload (field "file") and store it.
+
+        Args:
+            request: Upload request; its body must not have been read yet
+
+        Returns:
+            Tuple of (stored PDF path, hex SHA-256 of its content, uploaded filename)
+
+        Raises:
+            HTTPException: 413 if the body exceeds the size limit, 400 if it has no PDF file
+        """
+        body_limit = self.config.max_bytes + MULTIPART_OVERHEAD_BYTES
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > body_limit:
+            raise self._too_large()
+
+        received = 0
+
+        async def receive():
+            nonlocal received
+            message = await request.receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > body_limit:
+                    raise self._too_large()
+            return message
+
+        form = await Request(request.scope, receive).form(max_files=1)
+        try:
+            file = form.get("file")
+            if not isinstance(file, UploadFile):
+                raise HTTPException(status_code=400, detail="Upload must include a PDF in the 'file' field")
+            pdf_path, sha256 = await self.save(file)
+            return pdf_path, sha256, file.filename or pdf_path.name
+        finally:
+            await form.close()
+
+    async def save(self, file: UploadFile) -> Tuple[Path, str]:
+        """
+        Copy an uploaded PDF into the store.
+
+        Args:
+            file: Uploaded file from the request
+
+        Returns:
+            Tuple of (stored PDF path, hex SHA-256 of its content)
+
+        Raises:
+            HTTPException: 413 if the upload exceeds the size limit, 400 if it isn't a PDF
+        """
+        if file.size is not None and file.size > self.config.max_bytes:
+            raise self._too_large()
+
+        tmp_path = temp_path(self.upload_dir / "upload")
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        try:
+            with open(tmp_path, "wb") as handle:
+                while True:
+                    chunk = await file.read(self.config.chunk_size)
+                    if not chunk:
+                        break
+                    if len(head) < len(PDF_MAGIC):
+                        # Reads may return fewer bytes than the magic, so collect it across chunks
+                        head += chunk[:len(PDF_MAGIC) - len(head)]
+                        if not PDF_MAGIC.startswith(head):
+                            raise self._not_pdf()
+                    size += len(chunk)
+                    if size > self.config.max_bytes:
+                        raise self._too_large()
+                    digest.update(chunk)
+                    await run_in_threadpool(handle.write, chunk)
+
+            if size == 0:
+                raise HTTPException(status_code=400, detail="Uploaded file is empty")
+            if head != PDF_MAGIC:
+                raise self._not_pdf()
+
+            sha256 = digest.hexdigest()
+            pdf_path = self.upload_dir / f"{sha256}.pdf"
+            if pdf_path.exists():
+                print(f"Upload matches stored PDF {pdf_path.name}")
+            else:
+                os.replace(tmp_path, pdf_path)
+            # The extraction cache is keyed by content; hand it the hash instead of re-reading the file
+            pdf_extraction_cache.remember_content_hash(pdf_path, sha256)
+            return pdf_path, sha256
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def path_for(self, document_id: str) -> Optional[Path]:
+        """Return the stored PDF for a document ID (its SHA-256), or None if there is none."""
+        if not DOCUMENT_ID_PATTERN.match(document_id):
+            return None
+        pdf_path = self.upload_dir / f"{document_id}.pdf"
+        return pdf_path if pdf_path.exists() else None
+
+    def _not_pdf(self) -> HTTPException:
+        return HTTPException(status_code=400, detail="Uploaded file is not a PDF")
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=413,
+            detail=f"PDF exceeds the upload limit of {self.config.max_bytes // (1024 * 1024)} MB",
+        )
+
+
+# Process-wide upload store
+pdf_upload_store = PDFUploadStore()
@@ -0,0 +1,109 @@
+import os
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+
+@dataclass
+class PDFWorkerConfig:
+    """Configuration for the PDF extraction process pool."""
+    max_workers: int = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 2)))
+    # Jobs allowed to be running or queued before new ones are rejected with 429
+    max_pending_jobs: int = int(os.getenv("PDF_MAX_PENDING_JOBS", "16"))
+    job_timeout_seconds: float = float(os.getenv("PDF_JOB_TIMEOUT_SECONDS", "60"))
+
+
+class PDFExtractionService:
+    """
+    Bounded process pool for CPU-heavy PDF work.
+
+    Keeps PyMuPDF/PIL work off the event loop and spreads it across cores.
+    The number of outstanding jobs is capped: once the cap is reached new jobs
+    are rejected with 429 instead of queueing without bound. A job that exceeds
+    its timeout is reported as 504 to the caller, but keeps its slot until the
+    worker actually finishes so the cap reflects real load.
+    """
+
+    def __init__(self, config: Optional[PDFWorkerConfig] = None):
+        self.config = config or PDFWorkerConfig()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the pool on first use so importing the app doesn't spawn processes."""
+        with self._lock:
+            if self._executor is None:
+                # spawn avoids forking a process that already runs event loop and threadpool threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.config.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a picklable, module-level function in the process pool.
+
+        Args:
+            func: Function to execute in a worker process
+            *args: Picklable positional arguments for the function
+
+        Returns:
+            The function's return value
+
+        Raises:
+            HTTPException: 429 when the pool is saturated, 504 when the job times out
+        """
+        with self._lock:
+            if self._pending >= self.config.max_pending_jobs:
+                raise HTTPException(
+                    status_code=429,
+                    detail="PDF processing is busy, please retry shortly",
+                    headers={"Retry-After": "5"},
+                )
+            self._pending += 1
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            # shield so a timeout doesn't try to cancel the concurrent future out from under the worker
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)),
+                timeout=self.config.job_timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="PDF processing timed out")
+        except BrokenProcessPool:
+            # A worker died (e.g. crashed on a malformed PDF); start a fresh pool for later jobs
+            self._discard_executor()
+            raise
+
+    def _discard_executor(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; queued jobs are cancelled."""
+        self._discard_executor()
+
+
+# Process-wide pool shared by the PDF endpoints
+pdf_extraction_service = PDFExtractionService()
@@ -0,0 +1,104 @@
+import os
+import io
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from PIL import Image, features
+
+from app.storybook.illustration_cache import illustration_cache
+
+
+# Longest side of the reference copies uploaded with images.edit, and the memory they may use
+REFERENCE_IMAGE_MAX_SIZE = int(os.getenv("REFERENCE_IMAGE_MAX_SIZE", "512"))
+REFERENCE_IMAGE_CACHE_MAX_MB = int(os.getenv("REFERENCE_IMAGE_CACHE_MAX_MB", "64"))
+
+# Formats accepted by the images edit endpoint; WEBP keeps transparency at a fraction of PNG's size
+REFERENCE_IMAGE_FORMAT = "WEBP" if features.check("webp") else "PNG"
+REFERENCE_IMAGE_QUALITY = 85
+
+# (filename, content, media type) as accepted by the OpenAI client for file uploads
+ReferenceFile = Tuple[str, bytes, str]
+
+
+class ReferenceImageCache:
+    """
+    In-memory cache of downscaled character portraits used as images.edit references.
+
+    A portrait is read, downscaled to REFERENCE_IMAGE_MAX_SIZE and re-encoded
+    once, then every page that references it uploads the small copy from
+    memory. Entries are keyed by content hash, so a regenerated portrait gets
+    a new entry, and are evicted least recently used first beyond
+    REFERENCE_IMAGE_CACHE_MAX_MB.
+    """
+
+    def __init__(self, max_size: int = REFERENCE_IMAGE_MAX_SIZE, max_bytes: int = REFERENCE_IMAGE_CACHE_MAX_MB * 1024 * 1024):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, ReferenceFile]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path) -> ReferenceFile:
+        """
+        Return the upload-ready reference copy of an image, building it on first use.
+
+        Args:
+            path: Character portrait on disk
+
+        Returns:
+            Tuple of (filename, image bytes, media type)
+        """
+        digest = illustration_cache.reference_hash(path)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = self._build(Path(path), digest)
+        with self._lock:
+            if digest not in self._entries:
+                self._entries[digest] = entry
+                self._bytes += len(entry[1])
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[1])
+        return entry
+
+    def get_many(self, paths: List[Path]) -> List[ReferenceFile]:
+        return [self.get(path) for path in paths]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _build(self, path: Path, digest: str) -> ReferenceFile:
+        """Downscale and re-encode a portrait; the original is used if it is already smaller."""
+        original = path.read_bytes()
+        with Image.open(io.BytesIO(original)) as image:
+            image.thumbnail((self.max_size, self.max_size), Image.LANCZOS)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            buffered = io.BytesIO()
+            image.save(buffered, format=REFERENCE_IMAGE_FORMAT, quality=REFERENCE_IMAGE_QUALITY)
+
+        data = buffered.getvalue()
+        if len(data) >= len(original) and path.suffix.lower() == ".png":
+            return (f"{digest[:16]}.png", original, "image/png")
+        extension = REFERENCE_IMAGE_FORMAT.lower()
+        return (f"{digest[:16]}.{extension}", data, f"image/{extension}")
+
+
+# Process-wide cache shared by every illustrator
+reference_image_cache = ReferenceImageCache()
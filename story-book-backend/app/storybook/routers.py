@@ -1,20 +1,42 @@
 # story-book-backend/app/storybook/routers.py
 # Complete corrected version with all missing functions
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 import PyPDF2
-import fitz  
 import os
-import base64
 import json
+import asyncio
+import orjson
 from pathlib import Path
-from PIL import Image
-import io
 from app.storybook.schemas import *
 from app.storybook.services import *
+from app.storybook.pdf_cache import pdf_extraction_cache
+from app.storybook.asset_store import asset_store, IMMUTABLE_CACHE_CONTROL
+from app.storybook.pdf_workers import pdf_extraction_service
+from app.storybook.sample_catalog import sample_catalog
+from app.storybook.sample_bundles import sample_bundles
+from app.storybook.pdf_uploads import pdf_upload_store, PDF_UPLOAD_OPENAPI
+from app.storybook.illustration_jobs import illustration_job_queue, JOB_COMPLETED, JOB_FAILED
+from app.storybook.pdf_extractor import (
+    IMAGE_MODE_BASE64,
+    IMAGE_MODE_URL,
+    IMAGE_MODES,
+    PDF_EXTRACTOR_VERSION,
+    RENDER_FORMATS,
+    RENDER_MIN_DPI,
+    RENDER_MAX_DPI,
+    RENDER_MAX_WIDTH,
+    render_pdf_page,
+    get_pdf_page_count,
+    extract_pdf_pages,
+    extract_pdf_page_range,
+    extract_pdf_page_at,
+    dedupe_pdf_images,
+)
 
 router = APIRouter(
     prefix="/storybook",
@@ -35,31 +57,98 @@ async def get_stories(request: StoryRequest) -> StoryBook:
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@router.post("/get_stories/stream")
+async def stream_stories(request: StoryRequest, format: str = "ndjson"):
+    """
+    Stream story generation as NDJSON (default) or Server-Sent Events (format=sse).
+    Emits title, characters and each page as soon as the LLM has finished them,
+    followed by the complete story.
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    
+    formatter = format_sse_event if format == "sse" else format_ndjson_event
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    
+    async def events():
+        async for event, data in stream_story_generation(request):
+            yield formatter(event, data)
+    
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/illustration-jobs")
+async def submit_illustration_job(request: IllustrationJobRequest) -> IllustrationJob:
+    """
+    Queue a generated story for full illustration in the background.
+    Returns the job immediately; poll it or subscribe to its events for progress.
+    """
+    try:
+        job_id = await illustration_job_queue.submit(request.story, request.quality, request.openai_api_key)
+        return await run_in_threadpool(illustration_job_queue.get, job_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error submitting illustration job: {str(e)}")
+
+
+@router.get("/illustration-jobs/{job_id}")
+async def get_illustration_job(job_id: str) -> IllustrationJob:
+    """
+    Get status, progress and (once completed) the illustrated story of a job.
+    """
+    job = await run_in_threadpool(illustration_job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Illustration job {job_id} not found")
+    return job
+
+
+@router.get("/illustration-jobs/{job_id}/events")
+async def stream_illustration_job(job_id: str):
+    """
+    Subscribe to a job as Server-Sent Events: "progress" whenever it advances,
+    then "completed" (with the illustrated story) or "failed".
+    """
+    job = await run_in_threadpool(illustration_job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Illustration job {job_id} not found")
+    
+    async def events():
+        last_update = None
+        while True:
+            job = await run_in_threadpool(illustration_job_queue.get, job_id)
+            if job.status in (JOB_COMPLETED, JOB_FAILED):
+                yield format_sse_event(job.status, job.model_dump())
+                return
+            if job.updated_at != last_update:
+                last_update = job.updated_at
+                yield format_sse_event("progress", job.model_dump(exclude={"result"}))
+            await asyncio.sleep(1)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
 # NEW: Multiple PDF support endpoints
 @router.get("/sample/pdf-list")
 async def get_sample_pdf_list():
     """
     Get list of all sample PDFs from the sample folder.
-    Returns metadata for each PDF without processing content.
+    Served from the sample catalog index, which includes page count, size and
+    a cover thumbnail for each PDF and is only rebuilt for changed files.
     """
     try:
-        sample_dir = Path("sample")
-        
-        if not sample_dir.exists():
-            return {"pdfs": []}
-        
-        pdf_files = list(sample_dir.glob("*.pdf"))
         pdf_list = []
         
-        for pdf_file in pdf_files:
-            # Generate basic metadata without processing full content
+        for entry in await sample_catalog.entries():
+            pdf_id = entry["id"]
             pdf_info = {
-                "id": pdf_file.stem,  # filename without extension
-                "filename": pdf_file.name,
-                "title": get_custom_title_for_file(pdf_file.stem),
-                "description": f"Sample storybook: {pdf_file.stem.replace('_', ' ').title()}",
-                "file_path": str(pdf_file),
-                "download_url": f"/static/sample/{pdf_file.name}"
+                "id": pdf_id,  # filename without extension
+                "filename": entry["filename"],
+                "title": get_custom_title_for_file(pdf_id),
+                "description": f"Sample storybook: {pdf_id.replace('_', ' ').title()}",
+                "file_path": entry["file_path"],
+                "download_url": f"/static/sample/{entry['filename']}",
+                "totalPages": entry["totalPages"],
+                "sizeBytes": entry["sizeBytes"],
+                "cover": entry["cover"],
             }
             pdf_list.append(pdf_info)
         
@@ -70,34 +159,96 @@ async def get_sample_pdf_list():
 
 
 @router.get("/sample/pdf-data/{pdf_id}")
-async def get_sample_pdf_data(pdf_id: str):
+async def get_sample_pdf_data(
+    pdf_id: str,
+    images: str = IMAGE_MODE_BASE64,
+    page_from: int = Query(1, alias="from"),
+    page_to: Optional[int] = Query(None, alias="to"),
+    dedupe: bool = False,
+):
     """
     Get processed data for a specific sample PDF.
+    Pass images=url to receive cacheable asset URLs instead of inline base64 images,
+    from/to (1-based, inclusive) to only return a range of pages, and dedupe=true
+    to send each distinct image once in a top-level "images" map.
     """
+    validate_image_mode(images)
+    validate_page_range(page_from, page_to)
     try:
         sample_dir = Path("sample")
         pdf_path = sample_dir / f"{pdf_id}.pdf"
         
         if not pdf_path.exists():
             # Return mock data if specific PDF doesn't exist
-            return get_mock_pdf_data_for_id(pdf_id)
+            return slice_pdf_data(get_mock_pdf_data_for_id(pdf_id), page_from, page_to)
         
         # Extract PDF content
-        pdf_data = extract_pdf_content(pdf_path)
-        return pdf_data
+        pdf_data = await extract_pdf_content(pdf_path, image_mode=images, page_from=page_from, page_to=page_to)
+        return dedupe_pdf_images(pdf_data) if dedupe else pdf_data
         
+    except HTTPException:
+        # Busy/timeout errors from the extraction pool keep their status code
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF {pdf_id}: {str(e)}")
 
 
+@router.get("/sample/pdf-data/{pdf_id}/pages/{page_num}/render")
+async def render_sample_pdf_page(
+    request: Request,
+    pdf_id: str,
+    page_num: int,
+    dpi: Optional[int] = None,
+    width: Optional[int] = None,
+    format: str = "png",
+):
+    """
+    Render a 1-based page of a sample PDF to an image at the given dpi or width.
+    """
+    pdf_path = Path("sample") / f"{pdf_id}.pdf"
+    if not pdf_path.exists():
+        raise HTTPException(status_code=404, detail=f"Sample PDF {pdf_id} not found")
+    # Sample files can be replaced in place, so clients revalidate with the ETag every time
+    return await render_pdf_page_response(request, pdf_path, page_num, dpi, width, format, "no-cache")
+
+
+@router.get("/sample/pdf-data/{pdf_id}/stream")
+async def stream_sample_pdf_data(
+    pdf_id: str,
+    format: str = "ndjson",
+    images: str = IMAGE_MODE_BASE64,
+    page_from: int = Query(1, alias="from"),
+    page_to: Optional[int] = Query(None, alias="to"),
+):
+    """
+    Stream a sample PDF page by page as NDJSON (default) or Server-Sent Events (format=sse).
+    Each page is sent as soon as it has been extracted.
+    """
+    validate_image_mode(images)
+    validate_page_range(page_from, page_to)
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    
+    pdf_path = Path("sample") / f"{pdf_id}.pdf"
+    formatter = format_sse_event if format == "sse" else format_ndjson_event
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    
+    async def events():
+        async for event, data in stream_pdf_events(pdf_path, images, page_from, page_to):
+            yield formatter(event, data)
+    
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
 # LEGACY: Keep this for backward compatibility
 @router.get("/sample/pdf-data")
-async def get_sample_pdf_data_legacy():
+async def get_sample_pdf_data_legacy(images: str = IMAGE_MODE_BASE64, dedupe: bool = False):
     """
     Get sample PDF data from the backend sample folder.
     This endpoint processes the PDF and extracts both text and images.
     LEGACY VERSION - for backward compatibility.
     """
+    validate_image_mode(images)
     try:
         # Path to your sample PDF (adjust as needed)
         sample_pdf_path = Path("sample/sample_storybook.pdf")
@@ -107,36 +258,164 @@ async def get_sample_pdf_data_legacy():
             return get_mock_pdf_data()
         
         # Extract PDF content
-        pdf_data = extract_pdf_content(sample_pdf_path)
-        return pdf_data
+        pdf_data = await extract_pdf_content(sample_pdf_path, image_mode=images)
+        return dedupe_pdf_images(pdf_data) if dedupe else pdf_data
         
+    except HTTPException:
+        # Busy/timeout errors from the extraction pool keep their status code
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
 
-@router.post("/upload-pdf")
-async def upload_pdf(file: UploadFile = File(...)):
+@router.post("/upload-pdf", openapi_extra=PDF_UPLOAD_OPENAPI)
+async def upload_pdf(request: Request, images: str = IMAGE_MODE_BASE64, dedupe: bool = False, lazy: bool = False):
     """
-    Upload and process a new PDF file.
+    Upload and process a new PDF file, sent as multipart form field "file".
+    The form is parsed here rather than by FastAPI so oversized bodies get a 413
+    before (Content-Length) or while (chunked) they are received, not after
+    being spooled in full. The PDF is stored under its content hash, so
+    uploading the same PDF again is served from the extraction cache.
+    The response's documentId addresses the stored PDF for per-page requests;
+    with lazy=true no pages are extracted up front and the reader fetches them
+    one at a time from /uploads/{documentId}/pages/{page}.
     """
+    validate_image_mode(images)
     try:
         # Save uploaded PDF
-        upload_dir = Path("uploads")
-        upload_dir.mkdir(exist_ok=True)
+        file_path, document_id, filename = await pdf_upload_store.save_request(request)
+        filename_base = Path(filename).stem
         
-        file_path = upload_dir / file.filename
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        if lazy:
+            total_pages = await pdf_extraction_service.run(get_pdf_page_count, file_path)
+            return {
+                "id": filename_base,
+                "title": get_custom_title_for_file(filename_base),
+                "documentId": document_id,
+                "totalPages": total_pages,
+                "pages": [],
+            }
         
-        # Process the uploaded PDF
-        pdf_data = extract_pdf_content(file_path)
-        return pdf_data
+        # Process the uploaded PDF; id and title still come from the uploaded filename
+        pdf_data = await extract_pdf_content(file_path, image_mode=images, filename_base=filename_base)
+        pdf_data = {**pdf_data, "documentId": document_id}
+        return dedupe_pdf_images(pdf_data) if dedupe else pdf_data
         
+    except HTTPException:
+        # Busy/timeout errors from the extraction pool keep their status code
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error uploading PDF: {str(e)}")
 
 
+@router.get("/uploads/{document_id}/pages/{page_num}")
+async def get_uploaded_pdf_page(document_id: str, page_num: int, images: str = IMAGE_MODE_BASE64):
+    """
+    Get a single 1-based page of an uploaded PDF.
+    Served from the extraction cache when the whole book has been extracted,
+    otherwise only this page is extracted, from a document kept open by the
+    PDF workers, so page 400 of a large book costs the same as page 1.
+    """
+    validate_image_mode(images)
+    if page_num < 1:
+        raise HTTPException(status_code=400, detail="page must be 1 or greater")
+    pdf_path = pdf_upload_store.path_for(document_id)
+    if pdf_path is None:
+        raise HTTPException(status_code=404, detail=f"Uploaded PDF {document_id} not found")
+    
+    try:
+        cached_pages = await run_in_threadpool(get_cached_pdf_pages, pdf_path, images)
+        if cached_pages is not None:
+            total_pages = len(cached_pages)
+            pages_data = cached_pages[page_num - 1:page_num]
+        else:
+            total_pages, pages_data = await pdf_extraction_service.run(
+                extract_pdf_page_range, pdf_path, images, page_num, page_num
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error extracting page {page_num}: {str(e)}")
+    
+    if not pages_data:
+        raise HTTPException(status_code=404, detail=f"Page {page_num} not found; the PDF has {total_pages} pages")
+    return {"documentId": document_id, "totalPages": total_pages, "page": pages_data[0]}
+
+
+@router.get("/uploads/{document_id}/pages/{page_num}/render")
+async def render_uploaded_pdf_page(
+    request: Request,
+    document_id: str,
+    page_num: int,
+    dpi: Optional[int] = None,
+    width: Optional[int] = None,
+    format: str = "png",
+):
+    """
+    Render a 1-based page of an uploaded PDF to an image at the given dpi or width.
+    """
+    pdf_path = pdf_upload_store.path_for(document_id)
+    if pdf_path is None:
+        raise HTTPException(status_code=404, detail=f"Uploaded PDF {document_id} not found")
+    # Uploads are addressed by content hash, so a rendered page never changes
+    return await render_pdf_page_response(request, pdf_path, page_num, dpi, width, format, IMMUTABLE_CACHE_CONTROL)
+
+
+async def render_pdf_page_response(
+    request: Request,
+    pdf_path: Path,
+    page_num: int,
+    dpi: Optional[int],
+    width: Optional[int],
+    image_format: str,
+    cache_control: str,
+) -> Response:
+    """
+    Serve a rasterized page, rendering it in the PDF worker pool on first request.
+    Renders are cached by PDF content, page, resolution and format and stored
+    as immutable assets; the asset's content hash is the ETag, so revalidating
+    clients get 304 Not Modified without the image being sent again.
+    """
+    if page_num < 1:
+        raise HTTPException(status_code=400, detail="page must be 1 or greater")
+    if image_format not in RENDER_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format '{image_format}'. Expected one of: {', '.join(RENDER_FORMATS)}"
+        )
+    if width is not None and not 1 <= width <= RENDER_MAX_WIDTH:
+        raise HTTPException(status_code=400, detail=f"width must be between 1 and {RENDER_MAX_WIDTH}")
+    if dpi is not None and not RENDER_MIN_DPI <= dpi <= RENDER_MAX_DPI:
+        raise HTTPException(status_code=400, detail=f"dpi must be between {RENDER_MIN_DPI} and {RENDER_MAX_DPI}")
+    
+    resolution = f"w{width}" if width else f"d{dpi or 'default'}"
+    version = f"render-{PDF_EXTRACTOR_VERSION}-p{page_num}-{resolution}-{image_format}"
+    try:
+        cache_key = await run_in_threadpool(pdf_extraction_cache.cache_key, pdf_path, version)
+        rendered = await run_in_threadpool(pdf_extraction_cache.get, cache_key)
+        if rendered is not None and not asset_store.exists(rendered["url"]):
+            rendered = None
+        if rendered is None:
+            rendered = await pdf_extraction_service.run(
+                render_pdf_page, pdf_path, page_num - 1, dpi, width, image_format
+            )
+            if rendered is None:
+                raise HTTPException(status_code=404, detail=f"Page {page_num} not found")
+            await run_in_threadpool(pdf_extraction_cache.set, cache_key, rendered)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rendering page {page_num}: {str(e)}")
+    
+    asset_path = asset_store.path_for_url(rendered["url"])
+    etag = f'"{asset_path.stem}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    client_etags = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+    if etag in client_etags:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(asset_path, media_type=RENDER_FORMATS[image_format], headers=headers)
+
+
 def get_custom_title_for_file(filename: str) -> str:
     """
     Get custom title for a specific PDF file.
@@ -154,98 +433,215 @@ def get_custom_title_for_file(filename: str) -> str:
     return custom_titles.get(filename, filename.replace("_", " ").title())
 
 
-def determine_layout(text: str, images: List[Dict]) -> str:
+def validate_image_mode(image_mode: str) -> None:
     """
-    Determine the best layout based on content.
+    Reject unknown image modes before any PDF work is done.
     """
-    if not images:
-        return "text-only"
-    if not text or len(text) < 50:
-        return "image-only"
-    
-    # Simple heuristic based on content
-    layouts = ["image-left", "image-right", "image-top", "image-bottom"]
-    return layouts[len(text) % len(layouts)]
+    if image_mode not in IMAGE_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid images mode '{image_mode}'. Expected one of: {', '.join(IMAGE_MODES)}"
+        )
+
+
+def validate_page_range(page_from: int, page_to: Optional[int]) -> None:
+    """
+    Reject page ranges that can never match a page (pages are 1-based and inclusive).
+    """
+    if page_from < 1:
+        raise HTTPException(status_code=400, detail="'from' must be 1 or greater")
+    if page_to is not None and page_to < page_from:
+        raise HTTPException(status_code=400, detail="'to' must be greater than or equal to 'from'")
 
 
-def extract_pdf_content(pdf_path: Path) -> Dict[str, Any]:
+async def extract_pdf_content(
+    pdf_path: Path,
+    image_mode: str = IMAGE_MODE_BASE64,
+    page_from: int = 1,
+    page_to: Optional[int] = None,
+    filename_base: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     Extract text and images from PDF file with PDF ID support.
+    The id and title are derived from filename_base, defaulting to the file's stem.
+    Page extraction is cached by file content, so repeated requests for an
+    unchanged PDF are served from the extraction cache. Cache misses are
+    extracted in the PDF worker pool so the event loop is never blocked.
+    When a page range is requested and the full book is not cached yet, only
+    the requested pages are extracted.
     """
     try:
-        # Open PDF with PyMuPDF for better image extraction
-        doc = fitz.open(str(pdf_path))
-        pages_data = []
+        filename_base = filename_base or pdf_path.stem
+        full_book = page_from == 1 and page_to is None
+        cached_pages = await run_in_threadpool(get_cached_pdf_pages, pdf_path, image_mode)
         
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            
-            # Extract text
-            text = page.get_text().strip()
-            
-            # Extract images
-            image_list = page.get_images()
-            page_images = []
-            
-            for img_index, img in enumerate(image_list):
-                try:
-                    # Get image data
-                    xref = img[0]
-                    pix = fitz.Pixmap(doc, xref)
-                    
-                    # Convert to PIL Image
-                    if pix.n - pix.alpha < 4:  # GRAY or RGB
-                        img_data = pix.tobytes("png")
-                        pil_image = Image.open(io.BytesIO(img_data))
-                        
-                        # Convert to base64 for frontend
-                        buffered = io.BytesIO()
-                        pil_image.save(buffered, format="PNG")
-                        img_base64 = base64.b64encode(buffered.getvalue()).decode()
-                        
-                        page_images.append({
-                            "index": img_index,
-                            "base64": f"data:image/png;base64,{img_base64}",
-                            "width": pil_image.width,
-                            "height": pil_image.height
-                        })
-                    
-                    pix = None  # Clean up
-                    
-                except Exception as e:
-                    print(f"Error extracting image {img_index} from page {page_num}: {e}")
-                    continue
-            
-            # Create page data
-            page_data = {
-                "id": page_num + 1,
-                "type": "mixed" if text and page_images else ("text" if text else "image"),
-                "content": {
-                    "text": text or "No text content on this page.",
-                    "images": page_images,
-                    "layout": determine_layout(text, page_images)
-                }
-            }
-            
-            pages_data.append(page_data)
-        
-        doc.close()
+        if cached_pages is not None:
+            total_pages = len(cached_pages)
+            pages_data = cached_pages[page_from - 1:page_to]
+        elif full_book:
+            pages_data = await pdf_extraction_service.run(extract_pdf_pages, pdf_path, image_mode)
+            total_pages = len(pages_data)
+            await run_in_threadpool(
+                pdf_extraction_cache.set,
+                pdf_extraction_cache.cache_key(pdf_path, pdf_cache_version(image_mode)),
+                pages_data,
+            )
+        else:
+            total_pages, pages_data = await pdf_extraction_service.run(
+                extract_pdf_page_range, pdf_path, image_mode, page_from, page_to
+            )
         
         # Get custom title
-        filename_base = pdf_path.stem
         custom_title = get_custom_title_for_file(filename_base)
         
-        return {
+        pdf_data = {
             "id": filename_base,
             "title": custom_title,
-            "description": f"Beautiful storybook with {len(pages_data)} pages of adventure and wonder",
-            "totalPages": len(pages_data),
+            "description": f"Beautiful storybook with {total_pages} pages of adventure and wonder",
+            "totalPages": total_pages,
             "pages": pages_data
         }
+        if not full_book:
+            pdf_data["from"] = page_from
+            pdf_data["to"] = min(page_to or total_pages, total_pages)
+        return pdf_data
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error extracting PDF content: {e}")
-        return get_mock_pdf_data_for_id(pdf_path.stem)
+        return slice_pdf_data(get_mock_pdf_data_for_id(filename_base or pdf_path.stem), page_from, page_to)
+
+
+def pdf_cache_version(image_mode: str) -> str:
+    """
+    Cache version for extracted pages; each image mode is cached separately.
+    """
+    return f"{PDF_EXTRACTOR_VERSION}-{image_mode}"
+
+
+def pages_validator(image_mode: str):
+    """
+    Return the validation hook for cached pages in the given image mode, if any.
+    """
+    return pages_assets_exist if image_mode == IMAGE_MODE_URL else None
+
+
+def get_cached_pdf_pages(pdf_path: Path, image_mode: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Return the fully extracted pages of a PDF if they are prebuilt in a sample
+    bundle or already cached, without extracting.
+    """
+    validate = pages_validator(image_mode)
+    pages_data = sample_bundles.get_pages(pdf_path, image_mode)
+    if pages_data is not None and (not validate or validate(pages_data)):
+        return pages_data
+    
+    pages_data = pdf_extraction_cache.get(
+        pdf_extraction_cache.cache_key(pdf_path, pdf_cache_version(image_mode))
+    )
+    if pages_data is not None and validate and not validate(pages_data):
+        return None
+    return pages_data
+
+
+def slice_pdf_data(pdf_data: Dict[str, Any], page_from: int = 1, page_to: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Restrict already built PDF data (e.g. mock data) to a page range.
+    """
+    if page_from == 1 and page_to is None:
+        return pdf_data
+    total_pages = len(pdf_data["pages"])
+    return {
+        **pdf_data,
+        "pages": pdf_data["pages"][page_from - 1:page_to],
+        "from": page_from,
+        "to": min(page_to or total_pages, total_pages),
+    }
+
+
+def pages_assets_exist(pages_data: List[Dict[str, Any]]) -> bool:
+    """
+    Check that every asset URL referenced by cached pages is still in the asset store.
+    """
+    return all(
+        asset_store.exists(image["url"])
+        and all(asset_store.exists(variant["url"]) for variant in image.get("variants", {}).values())
+        for page in pages_data
+        for image in page["content"]["images"]
+    )
+
+
+async def stream_pdf_events(
+    pdf_path: Path,
+    image_mode: str = IMAGE_MODE_BASE64,
+    page_from: int = 1,
+    page_to: Optional[int] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (event, data) pairs for a PDF: one "meta" event, one "page" event per
+    page as soon as it is extracted, then "end" (or "error" if extraction fails).
+    Cached books are replayed from the cache instead of being re-extracted;
+    otherwise each page is a separate job in the PDF worker pool.
+    """
+    pdf_id = pdf_path.stem
+    
+    if not pdf_path.exists():
+        # Stream mock data if the PDF doesn't exist, like the non-streaming endpoint
+        mock_data = slice_pdf_data(get_mock_pdf_data_for_id(pdf_id), page_from, page_to)
+        yield "meta", {k: v for k, v in mock_data.items() if k != "pages"}
+        for page_data in mock_data["pages"]:
+            yield "page", page_data
+        yield "end", {"id": pdf_id}
+        return
+    
+    try:
+        cached_pages = await run_in_threadpool(get_cached_pdf_pages, pdf_path, image_mode)
+        if cached_pages is not None:
+            total_pages = len(cached_pages)
+        else:
+            total_pages = await pdf_extraction_service.run(get_pdf_page_count, pdf_path)
+        
+        yield "meta", {
+            "id": pdf_id,
+            "title": get_custom_title_for_file(pdf_id),
+            "description": f"Beautiful storybook with {total_pages} pages of adventure and wonder",
+            "totalPages": total_pages,
+            "from": page_from,
+            "to": min(page_to or total_pages, total_pages),
+        }
+        
+        if cached_pages is not None:
+            for page_data in cached_pages[page_from - 1:page_to]:
+                yield "page", page_data
+        else:
+            last_page = min(page_to or total_pages, total_pages)
+            for page_num in range(page_from - 1, last_page):
+                page_data = await pdf_extraction_service.run(
+                    extract_pdf_page_at, pdf_path, page_num, image_mode
+                )
+                yield "page", page_data
+        yield "end", {"id": pdf_id}
+        
+    except HTTPException as e:
+        yield "error", {"status": e.status_code, "detail": e.detail}
+    except Exception as e:
+        print(f"Error streaming PDF content: {e}")
+        yield "error", {"detail": f"Error processing PDF {pdf_id}: {str(e)}"}
+
+
+def format_ndjson_event(event: str, data: Dict[str, Any]) -> str:
+    """
+    Format a stream event as one line of newline-delimited JSON.
+    """
+    return orjson.dumps({"event": event, "data": data}).decode() + "\n"
+
+
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """
+    Format a stream event as a Server-Sent Events message.
+    """
+    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
 
 
 def get_mock_pdf_data_for_id(pdf_id: str) -> Dict[str, Any]:
@@ -0,0 +1,118 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.storybook.atomic_files import atomic_write
+from app.storybook.pdf_cache import pdf_extraction_cache
+from app.storybook.pdf_extractor import PDF_EXTRACTOR_VERSION
+
+
+BUNDLE_MANIFEST = "bundle.json"
+
+
+class SampleBundleStore:
+    """
+    Prebuilt extraction results for sample PDFs, written offline by the
+    ingest_pdfs command and served as-is by the /sample/* endpoints.
+
+    A bundle is a directory per PDF id holding bundle.json (source hash,
+    extractor version, catalog summary) and one pages.<image mode>.json per
+    image mode; the images themselves are files in the asset store. A bundle
+    is only used while its source hash and extractor version match the PDF
+    on disk, so replacing a sample or upgrading the extractor falls back to
+    on-demand extraction until the bundle is rebuilt.
+    """
+
+    def __init__(self, bundle_dir: Optional[str] = None, max_memory_entries: Optional[int] = None):
+        self.root = Path(bundle_dir or os.getenv("SAMPLE_BUNDLE_DIR", "sample/bundles"))
+        self.max_memory_entries = max_memory_entries or int(os.getenv("SAMPLE_BUNDLE_MEMORY_ENTRIES", "8"))
+        # (bundle file, mtime_ns) -> parsed JSON, so each bundle file is parsed once
+        self._loaded: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bundle_dir(self, pdf_id: str) -> Path:
+        return self.root / pdf_id
+
+    def write(self, pdf_path: Path, sha256: str, summary: Dict[str, Any], pages: Dict[str, List[Dict[str, Any]]]) -> Path:
+        """
+        Write the bundle for a PDF. The manifest is written last, so a bundle
+        interrupted half way is never picked up.
+
+        Args:
+            pdf_path: Source PDF
+            sha256: Content hash of the source PDF
+            summary: Catalog summary from summarize_pdf()
+            pages: Extracted pages by image mode
+
+        Returns:
+            The bundle directory
+        """
+        target = self.bundle_dir(pdf_path.stem)
+        target.mkdir(parents=True, exist_ok=True)
+        (target / BUNDLE_MANIFEST).unlink(missing_ok=True)
+        for image_mode, pages_data in pages.items():
+            self._write_json(target / f"pages.{image_mode}.json", pages_data)
+        self._write_json(target / BUNDLE_MANIFEST, {
+            "extractorVersion": PDF_EXTRACTOR_VERSION,
+            "source": {"filename": pdf_path.name, "sha256": sha256},
+            "imageModes": sorted(pages),
+            "summary": summary,
+        })
+        return target
+
+    def manifest(self, pdf_path: Path) -> Optional[Dict[str, Any]]:
+        """Return the bundle manifest for a PDF if a bundle exists and is current."""
+        manifest = self._load(self.bundle_dir(pdf_path.stem) / BUNDLE_MANIFEST)
+        if manifest is None or manifest.get("extractorVersion") != PDF_EXTRACTOR_VERSION:
+            return None
+        try:
+            if manifest["source"]["sha256"] != pdf_extraction_cache.content_hash(pdf_path):
+                return None
+        except OSError:
+            return None
+        return manifest
+
+    def get_summary(self, pdf_path: Path) -> Optional[Dict[str, Any]]:
+        """Return the prebuilt catalog summary for a PDF, or None without a current bundle."""
+        manifest = self.manifest(pdf_path)
+        return manifest["summary"] if manifest else None
+
+    def get_pages(self, pdf_path: Path, image_mode: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the prebuilt pages for a PDF in one image mode, or None without a current bundle."""
+        manifest = self.manifest(pdf_path)
+        if manifest is None or image_mode not in manifest.get("imageModes", ()):
+            return None
+        return self._load(self.bundle_dir(pdf_path.stem) / f"pages.{image_mode}.json")
+
+    def _load(self, path: Path) -> Optional[Any]:
+        """Parse a bundle file, reusing the parsed value while the file is unchanged."""
+        try:
+            key = (str(path), path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                return self._loaded[key]
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                value = json.load(handle)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable sample bundle file {path}: {e}")
+            return None
+        with self._lock:
+            self._loaded[key] = value
+            while len(self._loaded) > self.max_memory_entries:
+                self._loaded.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _write_json(path: Path, value: Any) -> None:
+        atomic_write(path, json.dumps(value, separators=(",", ":")))
+
+
+# Process-wide bundle store read by the sample endpoints
+sample_bundles = SampleBundleStore()
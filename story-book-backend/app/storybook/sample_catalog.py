@@ -0,0 +1,118 @@
+import os
+import time
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.storybook.asset_store import asset_store
+from app.storybook.pdf_cache import pdf_extraction_cache
+from app.storybook.pdf_extractor import PDF_EXTRACTOR_VERSION, summarize_pdf
+from app.storybook.pdf_workers import pdf_extraction_service
+from app.storybook.sample_bundles import sample_bundles
+
+
+class SampleCatalog:
+    """
+    In-memory index of the sample PDFs with page count, size and cover thumbnail.
+
+    The index is built at startup and kept current by comparing each file's
+    mtime and size: only new or changed PDFs are summarized again, deleted ones
+    are dropped. Summaries are also stored in the extraction cache, so a
+    restart doesn't re-render covers for unchanged files.
+    """
+
+    def __init__(self, sample_dir: str = "sample", refresh_interval: Optional[float] = None):
+        self.sample_dir = Path(sample_dir)
+        # Minimum seconds between directory scans; list calls in between are served as-is
+        self.refresh_interval = (
+            refresh_interval
+            if refresh_interval is not None
+            else float(os.getenv("SAMPLE_CATALOG_REFRESH_SECONDS", "5"))
+        )
+        # filename -> ((mtime_ns, size), entry)
+        self._entries: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        self._last_scan = 0.0
+        self._lock = asyncio.Lock()
+
+    async def entries(self) -> List[Dict[str, Any]]:
+        """
+        Return catalog entries sorted by filename, refreshing the index if it may be stale.
+
+        Returns:
+            List of dicts with id, filename, file_path, sizeBytes, totalPages and cover
+        """
+        if time.monotonic() - self._last_scan >= self.refresh_interval:
+            await self.refresh()
+        return [entry for _, (_, entry) in sorted(self._entries.items())]
+
+    async def refresh(self) -> None:
+        """Rescan the sample directory and summarize new or modified PDFs."""
+        async with self._lock:
+            files = await run_in_threadpool(self._scan)
+            self._entries = {
+                name: item for name, item in self._entries.items() if name in files
+            }
+
+            for name, (signature, pdf_path) in files.items():
+                known = self._entries.get(name)
+                # Keep unchanged entries unless their summary failed or the cover asset is gone
+                if (
+                    known
+                    and known[0] == signature
+                    and known[1]["totalPages"] is not None
+                    and self._cover_exists(known[1])
+                ):
+                    continue
+                self._entries[name] = (signature, await self._build_entry(pdf_path, signature[1]))
+
+            self._last_scan = time.monotonic()
+
+    def _scan(self) -> Dict[str, Tuple[Tuple[int, int], Path]]:
+        """Stat every PDF in the sample directory."""
+        if not self.sample_dir.exists():
+            return {}
+        files = {}
+        with os.scandir(self.sample_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".pdf"):
+                    stat = entry.stat()
+                    files[entry.name] = ((stat.st_mtime_ns, stat.st_size), self.sample_dir / entry.name)
+        return files
+
+    async def _build_entry(self, pdf_path: Path, size: int) -> Dict[str, Any]:
+        """Summarize one PDF, using its prebuilt bundle or the extraction cache when the content is unchanged."""
+        entry = {
+            "id": pdf_path.stem,
+            "filename": pdf_path.name,
+            "file_path": str(pdf_path),
+            "sizeBytes": size,
+            "totalPages": None,
+            "cover": None,
+        }
+        try:
+            summary = await run_in_threadpool(sample_bundles.get_summary, pdf_path)
+            if summary is not None and self._cover_exists(summary):
+                entry.update(summary)
+                return entry
+
+            version = f"summary-{PDF_EXTRACTOR_VERSION}"
+            key = await run_in_threadpool(pdf_extraction_cache.cache_key, pdf_path, version)
+            summary = await run_in_threadpool(pdf_extraction_cache.get, key)
+            if summary is None or not self._cover_exists(summary):
+                summary = await pdf_extraction_service.run(summarize_pdf, pdf_path)
+                await run_in_threadpool(pdf_extraction_cache.set, key, summary)
+            entry.update(summary)
+        except Exception as e:
+            print(f"Failed to summarize sample PDF {pdf_path}: {e}")
+        return entry
+
+    @staticmethod
+    def _cover_exists(summary: Dict[str, Any]) -> bool:
+        cover = summary.get("cover")
+        return cover is None or asset_store.exists(cover["url"])
+
+
+# Process-wide catalog of sample PDFs
+sample_catalog = SampleCatalog()
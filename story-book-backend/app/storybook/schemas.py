@@ -27,6 +27,7 @@ class StoryBookEachPage(BaseModel):
     illustration_description: str
     characters: list[CharacterDescription]
     illustration_path: str = ""
+    illustration_url: str = ""
     illustration_base64: str = ""
     
     
@@ -35,4 +36,20 @@ class StoryBook(BaseModel):
     story_description: str
     illustration_style: str
     story_characters: list[CharacterDescription]
-    story_book: list[StoryBookEachPage]
\ No newline at end of file
+    story_book: list[StoryBookEachPage]
+
+class IllustrationJobRequest(BaseModel):
+    story: StoryBook
+    quality: str = "medium"
+    openai_api_key: Optional[str] = None  # Kept in memory only, never persisted with the job
+
+class IllustrationJob(BaseModel):
+    job_id: str
+    status: str  # queued, running, completed or failed
+    progress_done: int = 0
+    progress_total: int = 0
+    message: str = ""
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+    result: Optional[StoryBook] = None
@@ -1,12 +1,24 @@
 import os
+import asyncio
 from fastapi import HTTPException
 from app.storybook.schemas import *
 from langchain_core.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
-from app.llm_models.llm_model import get_llm_with_api_key  # Updated import
+from app.llm_models.llm_model import llm_client_pool
 from openai import OpenAI
 from app.storybook.illustrator import StoryBookIllustrator, IllustrationConfig
 from pathlib import Path
+from typing import AsyncIterator, List, Tuple
+from app.storybook.story_stream import StoryBookStreamParser
+from app.storybook.story_cache import story_cache, story_cache_key
+from app.storybook.single_flight import SingleFlight
+
+# Upper bound on concurrent LLM story generations per worker, and how long one may take
+STORY_GENERATION_CONCURRENCY = int(os.getenv("STORY_GENERATION_CONCURRENCY", "8"))
+STORY_GENERATION_TIMEOUT_SECONDS = float(os.getenv("STORY_GENERATION_TIMEOUT_SECONDS", "120"))
+
+story_generation_semaphore = asyncio.Semaphore(STORY_GENERATION_CONCURRENCY)
+story_generation_flight = SingleFlight()
 
 
 def get_openai_client(api_key: str = None) -> OpenAI:
@@ -100,60 +112,115 @@ def generate_mock_story(input: StoryRequest) -> StoryBook:
     )
 
 
-async def story_text_generator(input: StoryRequest):
-    try:
-        # Check for API key availability and validate format
-        api_key = input.openai_api_key or os.getenv("OPENAI_API_KEY")
-        
-        if not api_key:
-            print("No OpenAI API key provided, generating mock story...")
-            return generate_mock_story(input)
+def get_story_chain(input: StoryRequest, streaming: bool = False):
+    """
+    Get the story chain for a request, or None when a mock story should be generated
+    (no API key, malformed API key or LLM initialization failure).
+    Chains are built once per pooled LLM client and reused across requests; the
+    streaming variant has no output parser so raw tokens can be parsed incrementally.
+    """
+    # Check for API key availability and validate format
+    api_key = input.openai_api_key or os.getenv("OPENAI_API_KEY")
+    
+    if not api_key:
+        print("No OpenAI API key provided, generating mock story...")
+        return None
+    
+    # Basic API key validation
+    if input.openai_api_key and not input.openai_api_key.startswith('sk-'):
+        print("Invalid API key format detected, generating mock story...")
+        return None
+    
+    # Get the pooled LLM chain for the appropriate API key
+    if streaming:
+        chain = llm_client_pool.get_runnable(
+            input.openai_api_key, "story_book_stream", lambda llm: STORY_PROMPT_TEMPLATE | llm
+        )
+    else:
+        chain = llm_client_pool.get_runnable(
+            input.openai_api_key, "story_book", lambda llm: STORY_PROMPT_TEMPLATE | llm | STORY_OUTPUT_PARSER
+        )
+    
+    if not chain:
+        print("Failed to initialize LLM, generating mock story...")
+    return chain
+
+
+def build_story_prompt():
+    """
+    Build the story prompt template and the StoryBook output parser.
+    Called once at import; use STORY_PROMPT_TEMPLATE and STORY_OUTPUT_PARSER.
+    """
+    # Load prompt template (resolved from this file so importing works from any working directory)
+    with open(Path(__file__).resolve().parent.parent / "prompts" / "story_book_builder.md") as file:
+        prompt = file.read()
         
-        # Basic API key validation
-        if input.openai_api_key and not input.openai_api_key.startswith('sk-'):
-            print("Invalid API key format detected, generating mock story...")
-            return generate_mock_story(input)
+    # Output parser for the LLM
+    parser = PydanticOutputParser(pydantic_object=StoryBook)
         
-        # Get LLM with appropriate API key
-        llm = get_llm_with_api_key(input.openai_api_key)
+    # Create a prompt template
+    prompt_template = PromptTemplate(
+        template=prompt,
+        input_variables=["age", "topic", "short_description", "page", "language", "illustration_style"],
+        partial_variables={"format_instructions": parser.get_format_instructions()}
+    )
+    return prompt_template, parser
+
+
+# Prompt file and format instructions are read once, not per request
+STORY_PROMPT_TEMPLATE, STORY_OUTPUT_PARSER = build_story_prompt()
+
+
+def story_chain_inputs(input: StoryRequest) -> dict:
+    """
+    Map a story request onto the prompt template variables.
+    """
+    return {
+        'age': input.age, 
+        'topic': input.topic, 
+        'short_description': input.short_description, 
+        'page': input.pages, 
+        'language': input.language, 
+        'illustration_style': input.illustration_style
+    }
+
+
+async def story_text_generator(input: StoryRequest):
+    try:
+        chain = get_story_chain(input)
         
-        if not llm:
-            print("Failed to initialize LLM, generating mock story...")
+        if not chain:
             return generate_mock_story(input)
         
-        # Load prompt template
-        with open("app/prompts/story_book_builder.md") as file:
-            prompt = file.read()
-            
-        # Output parser for the LLM
-        parser = PydanticOutputParser(pydantic_object=StoryBook)
-            
-        # Create a prompt template
-        prompt_template = PromptTemplate(
-            template=prompt,
-            input_variables=["age", "topic", "short_description", "page", "language", "illustration_style"],
-            partial_variables={"format_instructions": parser.get_format_instructions()}
-        )
-        
-        # Create the chain
-        chain = prompt_template | llm | parser
+        cached = await story_cache.get(input)
+        if cached:
+            print("Returning cached AI story book.")
+            return cached
         
         print("Generating AI story book...")
         
-        # Get response with better error handling
+        # Get response with better error handling. ainvoke keeps the event loop free while
+        # waiting on OpenAI; the semaphore caps concurrent calls and the timeout bounds each one.
+        async def generate():
+            async with story_generation_semaphore:
+                response = await asyncio.wait_for(
+                    chain.ainvoke(story_chain_inputs(input)),
+                    timeout=STORY_GENERATION_TIMEOUT_SECONDS,
+                )
+            await story_cache.set(input, response)
+            return response
+        
         try:
-            response = chain.invoke({
-                'age': input.age, 
-                'topic': input.topic, 
-                'short_description': input.short_description, 
-                'page': input.pages, 
-                'language': input.language, 
-                'illustration_style': input.illustration_style
-            })
+            # Identical requests already in flight share a single LLM call, whoever's key they
+            # carry (like the story cache); if that call fails each request retries with its own
+            response = await story_generation_flight.run(story_cache_key(input), generate)
             
             print("AI story book generated successfully.")
             return response
             
+        except asyncio.TimeoutError:
+            print(f"LLM generation timed out after {STORY_GENERATION_TIMEOUT_SECONDS}s, generating mock story...")
+            return generate_mock_story(input)
         except Exception as llm_error:
             # If LLM call fails, it's likely an API key issue
             print(f"LLM generation failed (likely API key issue): {llm_error}")
@@ -181,7 +248,86 @@ async def story_text_generator(input: StoryRequest):
         print("Falling back to mock story...")
         return generate_mock_story(input)
 
+
+async def stream_story_generation(input: StoryRequest) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Generate a story and yield (event, data) pairs as parts of it are completed.
+    
+    Events are "title", "characters", one "page" per story page, then "story"
+    with the full validated StoryBook. Cached and mock stories (no or invalid
+    API key, LLM failure before any page was sent) are streamed through the
+    same events.
+    """
+    chain = get_story_chain(input, streaming=True)
+    
+    cached = await story_cache.get(input) if chain else None
+    if cached:
+        print("Streaming cached AI story book.")
+        for event in story_events(cached):
+            yield event
+        return
     
+    if chain:
+        stream_parser = StoryBookStreamParser()
+        deadline = asyncio.get_running_loop().time() + STORY_GENERATION_TIMEOUT_SECONDS
+        sent_any = False
+        
+        print("Streaming AI story book...")
+        try:
+            async with story_generation_semaphore:
+                chunks = chain.astream(story_chain_inputs(input)).__aiter__()
+                while True:
+                    remaining = deadline - asyncio.get_running_loop().time()
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(remaining, 0))
+                    except StopAsyncIteration:
+                        break
+                    for event in stream_parser.feed(chunk.content or ""):
+                        sent_any = True
+                        yield event
+            
+            for event in stream_parser.finish():
+                yield event
+            response = STORY_OUTPUT_PARSER.parse(stream_parser.text)
+            print("AI story book streamed successfully.")
+            await story_cache.set(input, response)
+            yield "story", response.model_dump()
+            return
+            
+        except asyncio.TimeoutError:
+            print(f"LLM streaming timed out after {STORY_GENERATION_TIMEOUT_SECONDS}s")
+            error = "Story generation timed out"
+        except Exception as llm_error:
+            print(f"LLM streaming failed (likely API key issue): {llm_error}")
+            error = "Story generation failed"
+        
+        if sent_any:
+            # Part of a real story is already on the client; don't mix in a mock one
+            yield "error", {"detail": error}
+            return
+        print("Falling back to mock story...")
+    
+    for event in story_events(generate_mock_story(input)):
+        yield event
+
+
+def story_events(story: StoryBook) -> List[Tuple[str, dict]]:
+    """
+    Split an already complete story into the events emitted by stream_story_generation.
+    """
+    events = [
+        ("title", {
+            "story_title": story.story_title,
+            "story_description": story.story_description,
+            "illustration_style": story.illustration_style,
+        }),
+        ("characters", {"story_characters": [c.model_dump() for c in story.story_characters]}),
+    ]
+    events.extend(("page", page.model_dump()) for page in story.story_book)
+    events.append(("story", story.model_dump()))
+    return events
+
+
 async def create_illustration(illustration_description: str, api_key: str = None):
     try:
         client = get_openai_client(api_key)
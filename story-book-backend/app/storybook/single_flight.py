@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical async work.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task and share its result. Only successes
+    are shared: if the work fails, the leader gets the exception and every
+    follower runs its own func() instead, since a failure can be specific to
+    the leader (e.g. its API key) while the followers' own calls would work.
+    The task is shielded, so one waiter disconnecting doesn't cancel the
+    work for the others. Nothing is kept once the work finishes.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+        self.fallbacks = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func() for key unless the same key is already in flight.
+
+        Args:
+            key: Identity of the work, e.g. a hash of the normalized request
+            func: Zero-argument coroutine function doing the work with this caller's credentials
+
+        Returns:
+            The shared result, or this caller's own result if the shared work failed
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            return await asyncio.shield(task)
+
+        self.coalesced += 1
+        try:
+            return await asyncio.shield(task)
+        except Exception as e:
+            self.fallbacks += 1
+            print(f"Shared work for {str(key)[:24]} failed ({e}), retrying with this caller's own request")
+            return await func()
+
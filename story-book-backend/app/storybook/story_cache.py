@@ -0,0 +1,199 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.storybook.schemas import StoryBook, StoryRequest
+
+
+# Bump when prompt or output changes should invalidate previously cached stories
+STORY_CACHE_VERSION = "1"
+
+
+def story_cache_key(request: StoryRequest) -> str:
+    """
+    Build a cache key from the normalized story request fields.
+    Text is lowercased and whitespace collapsed so trivially different preset
+    submissions share an entry; the API key is deliberately not part of the key.
+    """
+    def normalize(value: str) -> str:
+        return re.sub(r"\s+", " ", (value or "").strip().lower())
+
+    fields = {
+        "version": STORY_CACHE_VERSION,
+        "short_description": normalize(request.short_description),
+        "pages": request.pages,
+        "age": normalize(request.age),
+        "topic": normalize(request.topic),
+        "language": normalize(request.language),
+        "illustration_style": normalize(request.illustration_style),
+    }
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+
+class StoryCacheBackend:
+    """Storage interface for cached stories; values are JSON serialisable dicts."""
+
+    # Whether calls do I/O and should be run off the event loop
+    blocking = False
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class MemoryStoryCacheBackend(StoryCacheBackend):
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteStoryCacheBackend(StoryCacheBackend):
+    """On-disk cache in a local SQLite file, shared by all workers on the host."""
+
+    blocking = True
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS story_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call keeps the backend safe to use from any threadpool thread
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT value FROM story_cache WHERE key = ? AND expires_at >= ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE story_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO story_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl_seconds, now),
+            )
+            conn.execute("DELETE FROM story_cache WHERE expires_at < ?", (now,))
+            conn.execute(
+                """
+                DELETE FROM story_cache WHERE key IN (
+                    SELECT key FROM story_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+
+class StoryCache:
+    """
+    Opt-in cache of generated StoryBooks keyed by normalized request fields.
+    Disabled unless STORY_CACHE_BACKEND is "memory" or "sqlite".
+    """
+
+    def __init__(self, backend: Optional[StoryCacheBackend] = None):
+        self.backend = backend
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    async def get(self, request: StoryRequest) -> Optional[StoryBook]:
+        """Return the cached story for a request, or None on a miss or when disabled."""
+        if not self.backend:
+            return None
+        key = story_cache_key(request)
+        try:
+            if self.backend.blocking:
+                value = await run_in_threadpool(self.backend.get, key)
+            else:
+                value = self.backend.get(key)
+            return StoryBook.model_validate(value) if value is not None else None
+        except Exception as e:
+            print(f"Story cache lookup failed: {e}")
+            return None
+
+    async def set(self, request: StoryRequest, story: StoryBook) -> None:
+        """Store a generated story; failures are logged and otherwise ignored."""
+        if not self.backend:
+            return
+        key = story_cache_key(request)
+        try:
+            if self.backend.blocking:
+                await run_in_threadpool(self.backend.set, key, story.model_dump())
+            else:
+                self.backend.set(key, story.model_dump())
+        except Exception as e:
+            print(f"Story cache store failed: {e}")
+
+
+def create_story_cache() -> StoryCache:
+    """Build the story cache from STORY_CACHE_* environment variables."""
+    backend_name = os.getenv("STORY_CACHE_BACKEND", "off").lower()
+    ttl_seconds = float(os.getenv("STORY_CACHE_TTL_SECONDS", "86400"))
+    max_entries = int(os.getenv("STORY_CACHE_MAX_ENTRIES", "1000"))
+
+    if backend_name == "memory":
+        return StoryCache(MemoryStoryCacheBackend(ttl_seconds, max_entries))
+    if backend_name == "sqlite":
+        path = os.getenv("STORY_CACHE_PATH", "cache/story_cache.sqlite3")
+        return StoryCache(SQLiteStoryCacheBackend(path, ttl_seconds, max_entries))
+    return StoryCache()
+
+
+# Process-wide story cache
+story_cache = create_story_cache()
@@ -0,0 +1,104 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.utils.json import parse_partial_json
+from pydantic import ValidationError
+
+from app.storybook.schemas import CharacterDescription, StoryBookEachPage
+
+
+# Characters after which the JSON structure may have gained a completed value
+STRUCTURAL_CHARS = set(',]}')
+
+
+class StoryBookStreamParser:
+    """
+    Incrementally parse the JSON StoryBook an LLM is streaming.
+
+    Feed raw token text as it arrives; each call returns the events that became
+    complete with it: "title" once the title/description/style fields are done,
+    "characters" once the character list is closed, and one "page" per finished
+    entry of story_book. A value counts as complete once the JSON has moved past
+    it (a later key or list item exists), so partially streamed strings are
+    never emitted.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._sent_title = False
+        self._sent_characters = False
+        self._sent_pages = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Add streamed text and return newly completed events.
+
+        Args:
+            chunk: Next piece of LLM output
+
+        Returns:
+            List of (event, data) tuples, possibly empty
+        """
+        self.text += chunk
+        # Only a structural character can complete a value, so skip re-parsing otherwise
+        if not STRUCTURAL_CHARS.intersection(chunk):
+            return []
+        return self._events(self._parse(), final=False)
+
+    def finish(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return events for anything still pending once the stream has ended."""
+        return self._events(self._parse(), final=True)
+
+    def _parse(self) -> Optional[Dict[str, Any]]:
+        """Parse the JSON object seen so far, ignoring any markdown fence around it."""
+        start = self.text.find("{")
+        if start == -1:
+            return None
+        end = self.text.rfind("}")
+        candidate = self.text[start:]
+        # Once the object is closed, trailing text (e.g. a closing ``` fence) is not JSON
+        if end > start and self.text[end + 1:].strip().strip("`").strip() == "":
+            candidate = self.text[start:end + 1]
+        try:
+            parsed = parse_partial_json(candidate)
+        except Exception:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+
+    def _events(self, parsed: Optional[Dict[str, Any]], final: bool) -> List[Tuple[str, Dict[str, Any]]]:
+        if not parsed:
+            return []
+        events = []
+        keys = list(parsed.keys())
+
+        def complete(key: str) -> bool:
+            return key in parsed and (final or keys.index(key) < len(keys) - 1)
+
+        title_keys = ("story_title", "story_description", "illustration_style")
+        if not self._sent_title and all(complete(key) for key in title_keys):
+            self._sent_title = True
+            events.append(("title", {key: parsed[key] for key in title_keys}))
+
+        if not self._sent_characters and complete("story_characters"):
+            try:
+                characters = [
+                    CharacterDescription.model_validate(character).model_dump()
+                    for character in parsed["story_characters"]
+                ]
+                self._sent_characters = True
+                events.append(("characters", {"story_characters": characters}))
+            except (ValidationError, TypeError):
+                pass
+
+        pages = parsed.get("story_book")
+        if isinstance(pages, list):
+            # The last item may still be streaming unless the output has ended
+            finished = len(pages) if final or "story_book" != keys[-1] else len(pages) - 1
+            while self._sent_pages < finished:
+                try:
+                    page = StoryBookEachPage.model_validate(pages[self._sent_pages])
+                except ValidationError:
+                    break
+                self._sent_pages += 1
+                events.append(("page", page.model_dump()))
+
+        return events
@@ -0,0 +1,91 @@
+# story-book-backend/benchmarks/bench_pdf_extraction.py
+# Compare per-page CPU time and peak allocations of the old PIL round-trip image
+# extraction against the current fast path.
+#
+# Run from story-book-backend/:
+#   python -m benchmarks.bench_pdf_extraction [path/to/book.pdf] [--repeat N]
+#
+# Peak allocations come from tracemalloc, so they cover Python-level buffers
+# (PNG/bytes/base64 copies) but not MuPDF's or Pillow's internal C allocations.
+
+import argparse
+import base64
+import io
+import time
+import tracemalloc
+from pathlib import Path
+
+import fitz
+from PIL import Image
+
+from app.storybook.pdf_extractor import encode_pdf_image
+
+
+def legacy_encode(doc, xref: int):
+    """The original extraction: Pixmap -> PNG -> PIL -> PNG again."""
+    pix = fitz.Pixmap(doc, xref)
+    if pix.n - pix.alpha >= 4:
+        return None
+    img_data = pix.tobytes("png")
+    pil_image = Image.open(io.BytesIO(img_data))
+    buffered = io.BytesIO()
+    pil_image.save(buffered, format="PNG")
+    return buffered.getvalue(), "image/png", pil_image.width, pil_image.height
+
+
+def run(doc, encoder) -> int:
+    """Encode every image on every page to a base64 data URI; returns total output bytes."""
+    total_bytes = 0
+    for page_num in range(len(doc)):
+        page = doc.load_page(page_num)
+        for img in page.get_images():
+            encoded = encoder(doc, img[0])
+            if encoded is None:
+                continue
+            data, media_type = encoded[0], encoded[1]
+            total_bytes += len(f"data:{media_type};base64,{base64.b64encode(data).decode()}")
+    return total_bytes
+
+
+def measure(doc, encoder, repeat: int):
+    """Return (cpu seconds per page, peak traced bytes, output bytes) for an encoder."""
+    # Warm up so PyMuPDF's internal caches don't skew the first strategy measured
+    run(doc, encoder)
+
+    cpu_start = time.process_time()
+    for _ in range(repeat):
+        output_bytes = run(doc, encoder)
+    cpu_per_page = (time.process_time() - cpu_start) / (repeat * len(doc))
+
+    tracemalloc.start()
+    run(doc, encoder)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_per_page, peak, output_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF image extraction strategies")
+    parser.add_argument("pdf", nargs="?", default="sample/sample_storybook.pdf")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    doc = fitz.open(str(Path(args.pdf)))
+    print(f"{args.pdf}: {len(doc)} pages, {args.repeat} runs\n")
+    print(f"{'strategy':<10} {'cpu ms/page':>12} {'peak alloc KiB':>15} {'output KiB':>11}")
+
+    results = {}
+    for name, encoder in (("legacy", legacy_encode), ("fast", encode_pdf_image)):
+        cpu, peak, output_bytes = measure(doc, encoder, args.repeat)
+        results[name] = (cpu, peak)
+        print(f"{name:<10} {cpu * 1000:>12.2f} {peak / 1024:>15.1f} {output_bytes / 1024:>11.1f}")
+
+    legacy_cpu, legacy_peak = results["legacy"]
+    fast_cpu, fast_peak = results["fast"]
+    print(f"\nCPU saved: {(1 - fast_cpu / legacy_cpu) * 100:.1f}%  "
+          f"peak allocation saved: {(1 - fast_peak / max(legacy_peak, 1)) * 100:.1f}%")
+    doc.close()
+
+
+if __name__ == "__main__":
+    main()
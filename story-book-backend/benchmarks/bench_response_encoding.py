@@ -0,0 +1,153 @@
+# story-book-backend/benchmarks/bench_response_encoding.py
+# Compare serialization time and bytes on the wire of the large JSON responses
+# (a 20-page StoryBook and the matching pdf-data payload) under the old stdlib
+# JSONResponse and the current ORJSONResponse, for each content coding the
+# CompressionMiddleware can negotiate.
+#
+# Run from story-book-backend/:
+#   python -m benchmarks.bench_response_encoding [--pages 20] [--image-kb 400] [--repeat 20]
+#
+# Payloads are synthetic: images are random bytes, which compress about as badly
+# as real PNG/JPEG data, so the ratios reflect the text and JSON overhead that
+# compression can actually remove. br is skipped unless the brotli package is installed.
+
+import argparse
+import base64
+import json
+import random
+import statistics
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.storybook.compression import CompressionConfig, available_encoders
+from app.storybook.schemas import CharacterDescription, StoryBook, StoryBookEachPage
+
+
+def fake_image(rng: random.Random, kib: int, media_type: str = "image/png") -> str:
+    return f"data:{media_type};base64,{base64.b64encode(rng.randbytes(kib * 1024)).decode()}"
+
+
+def build_story_book(pages: int, image_kb: int, inline_images: bool) -> StoryBook:
+    """A StoryBook as returned by the illustration endpoints, with inline base64 or URL illustrations."""
+    rng = random.Random(0)
+    characters = [
+        CharacterDescription(
+            character_name=name,
+            character_description=f"{name} is a small, curious animal with bright eyes and a striped scarf. " * 3,
+            character_image_path=f"illustrations/characters/{name.lower()}.png",
+        )
+        for name in ("Tara", "Milo", "Pip")
+    ]
+    story_pages = []
+    for page in range(1, pages + 1):
+        story_pages.append(StoryBookEachPage(
+            page=page,
+            story_text=f"On page {page}, Tara and her friends wandered deeper into the jungle, "
+                       "listening to the birds and following the river towards the old banyan tree. " * 4,
+            illustration_description="A watercolor scene of a fox, a monkey and a parrot by a river at dusk. " * 2,
+            characters=characters,
+            illustration_path=f"illustrations/pages/page_{page}.png",
+            illustration_url=f"/static/assets/{rng.randbytes(32).hex()}.png",
+            illustration_base64=fake_image(rng, image_kb) if inline_images else "",
+        ))
+    return StoryBook(
+        story_title="Tara and the Banyan Tree",
+        story_description="A curious fox and her friends follow the river to find the oldest tree in the jungle.",
+        illustration_style="watercolor",
+        story_characters=characters,
+        story_book=story_pages,
+    )
+
+
+def build_pdf_data(pages: int, image_kb: int, inline_images: bool) -> dict:
+    """A /sample/pdf-data payload with one image per page, inline as base64 or as asset URLs."""
+    rng = random.Random(1)
+    pdf_pages = []
+    for page in range(1, pages + 1):
+        if inline_images:
+            image = {"imageId": rng.randbytes(8).hex(), "base64": fake_image(rng, image_kb, "image/jpeg")}
+        else:
+            digest = rng.randbytes(32).hex()
+            url = f"/static/assets/{digest}.jpg"
+            image = {"imageId": digest[:16], "url": url, "base64": url, "variants": {
+                str(width): f"/static/assets/{rng.randbytes(32).hex()}.webp" for width in (320, 640, 1280)
+            }}
+        pdf_pages.append({
+            "id": page,
+            "type": "mixed",
+            "content": {
+                "text": f"Page {page}. The river bent around the hill and the friends stopped to rest. " * 6,
+                "images": [{"index": 0, **image, "width": 1024, "height": 1024}],
+                "layout": "image-top",
+            },
+        })
+    return {
+        "id": "bench",
+        "title": "Bench",
+        "filename": "bench.pdf",
+        "totalPages": pages,
+        "metadata": {"author": "Bench", "subject": "", "creator": "", "producer": ""},
+        "pages": pdf_pages,
+    }
+
+
+def stdlib_render(content) -> bytes:
+    # Same arguments as starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_render(content) -> bytes:
+    # Same options as fastapi.responses.ORJSONResponse.render
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def median_ms(fn, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def bench_payload(name: str, content, repeat: int, config: CompressionConfig):
+    print(f"\n{name}")
+    print(f"  {'encoder':<10} {'serialize ms':>13} {'bytes':>12}")
+    bodies = {}
+    for label, render in (("json", stdlib_render), ("orjson", orjson_render)):
+        ms, body = median_ms(lambda: render(content), repeat)
+        bodies[label] = body
+        print(f"  {label:<10} {ms:>13.2f} {len(body):>12,}")
+    assert orjson.loads(bodies["json"]) == orjson.loads(bodies["orjson"])
+
+    body = bodies["orjson"]
+    print(f"  {'coding':<10} {'compress ms':>13} {'bytes':>12} {'ratio':>7}")
+    print(f"  {'identity':<10} {0:>13.2f} {len(body):>12,} {1:>7.2f}")
+    for coding, compress in available_encoders().items():
+        ms, compressed = median_ms(lambda: compress(body, config), repeat)
+        print(f"  {coding:<10} {ms:>13.2f} {len(compressed):>12,} {len(body) / len(compressed):>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization and compression")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--image-kb", type=int, default=400, help="Size of each inline image before base64")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    config = CompressionConfig()
+    print(f"{args.pages} pages, {args.image_kb} KiB images, median of {args.repeat} runs")
+
+    for inline_images in (True, False):
+        mode = "inline base64 images" if inline_images else "image URLs"
+        # FastAPI runs jsonable_encoder before either response class renders, so it is left out of the timings
+        story = jsonable_encoder(build_story_book(args.pages, args.image_kb, inline_images))
+        bench_payload(f"StoryBook, {mode}", story, args.repeat, config)
+        bench_payload(f"pdf-data, {mode}", build_pdf_data(args.pages, args.image_kb, inline_images), args.repeat, config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# story-book-backend/benchmarks/load_get_stories.py
+# Load test for POST /storybook/get_stories: fires concurrent story requests at a
+# running server and reports throughput and latency percentiles.
+#
+# To compare before/after, start the server on each revision (single worker,
+# real OPENAI_API_KEY so requests hit gpt-4o) and run from story-book-backend/:
+#   uvicorn app.main:app --workers 1
+#   python -m benchmarks.load_get_stories --concurrency 8 --requests 16
+#
+# With the old blocking chain.invoke, wall time grows linearly with the number
+# of requests because the event loop serves one LLM call at a time.
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def build_payload(index: int, api_key: str = None) -> dict:
+    """Story request; the description varies per request so no layer can reuse results."""
+    payload = {
+        "short_description": f"Tara, a curious fox, load test run {index}",
+        "pages": 3,
+        "age": "4-6",
+        "topic": "jungle",
+        "language": "English",
+        "illustration_style": "watercolor",
+    }
+    if api_key:
+        payload["openai_api_key"] = api_key
+    return payload
+
+
+async def send(client: httpx.AsyncClient, url: str, payload: dict, semaphore: asyncio.Semaphore):
+    """Send one request and return (latency seconds, status code)."""
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            response = await client.post(url, json=payload)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        return time.perf_counter() - start, status
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test /storybook/get_stories")
+    parser.add_argument("--url", default="http://localhost:8000/storybook/get_stories")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--api-key", default=None, help="Sent as openai_api_key; defaults to the server's key")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            send(client, args.url, build_payload(i, args.api_key), semaphore)
+            for i in range(args.requests)
+        ))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    failures = sum(1 for _, status in results if status != 200)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+
+    print(f"requests: {args.requests}  concurrency: {args.concurrency}  failures: {failures}")
+    print(f"wall time: {elapsed:.1f}s  throughput: {args.requests / elapsed:.2f} req/s")
+    print(f"latency p50: {statistics.median(latencies):.1f}s  p95: {p95:.1f}s  max: {latencies[-1]:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# Storage locations and an API key are read at import time, so set them before the app is imported
+_root = tempfile.mkdtemp(prefix="storybook-tests-")
+for name, default in {
+    "UPLOAD_DIR": "uploads",
+    "ASSET_DIR": "assets",
+    "PDF_CACHE_DIR": "cache/pdf_extraction",
+    "ILLUSTRATION_CACHE_DIR": "cache/illustrations",
+    "STORY_CACHE_PATH": "cache/story_cache.sqlite3",
+    "ILLUSTRATION_JOBS_DB": "data/illustration_jobs.sqlite3",
+    "ILLUSTRATION_JOBS_DIR": "illustrations",
+}.items():
+    os.environ.setdefault(name, os.path.join(_root, default))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
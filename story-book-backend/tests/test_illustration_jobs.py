@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+from openai import RateLimitError
+
+from app.storybook.illustration_jobs import IllustrationJobQueue, JOB_COMPLETED, JOB_FAILED, OWN_KEY_LOST_ERROR
+from app.storybook.illustrator import StoryBookIllustrator
+from app.storybook.schemas import CharacterDescription, StoryBook, StoryBookEachPage
+
+
+def make_story(pages: int = 3) -> StoryBook:
+    characters = [CharacterDescription(character_name="Tara", character_description="A curious fox")]
+    return StoryBook(
+        story_title="Tara",
+        story_description="A fox story",
+        illustration_style="watercolor",
+        story_characters=characters,
+        story_book=[
+            StoryBookEachPage(page=page, story_text="...", illustration_description=f"Scene {page}", characters=characters)
+            for page in range(1, pages + 1)
+        ],
+    )
+
+
+async def run_job(queue: IllustrationJobQueue, api_key: str = None):
+    job_id = await queue.submit(make_story(), api_key=api_key)
+    while queue.get(job_id).status not in (JOB_COMPLETED, JOB_FAILED):
+        await asyncio.sleep(0.01)
+    await queue.stop()
+    return queue.get(job_id)
+
+
+def test_job_fails_when_illustrations_fail(tmp_path, monkeypatch):
+    async def broken(self, prompt, size, characters=None):
+        raise RuntimeError("images API unavailable")
+
+    monkeypatch.setattr(StoryBookIllustrator, "_request_image", broken)
+    queue = IllustrationJobQueue(db_path=str(tmp_path / "jobs.sqlite3"))
+    queue.output_root = tmp_path / "out"
+
+    job = asyncio.run(run_job(queue))
+    assert job.status == JOB_FAILED
+    assert "4 illustrations failed" in job.error
+    assert "images API unavailable" in job.error
+    assert job.result is not None and not any(page.illustration_url for page in job.result.story_book)
+
+
+def test_exhausted_quota_stops_the_run(tmp_path, monkeypatch):
+    requests = []
+
+    async def out_of_quota(**kwargs):
+        requests.append(kwargs)
+        response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com/v1/images"))
+        raise RateLimitError("quota", response=response, body={"code": "insufficient_quota"})
+
+    original_init = StoryBookIllustrator.__init__
+
+    def init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        self.client.images.generate = out_of_quota
+        self.client.images.edit = out_of_quota
+
+    monkeypatch.setattr(StoryBookIllustrator, "__init__", init)
+    queue = IllustrationJobQueue(db_path=str(tmp_path / "jobs.sqlite3"))
+    queue.output_root = tmp_path / "out"
+
+    job = asyncio.run(run_job(queue, api_key="sk-user"))
+    assert job.status == JOB_FAILED
+    assert "exhausted its quota" in job.error
+    # Only the portrait is requested; no page is sent after the quota error
+    assert len(requests) == 1
+
+
+def test_own_key_job_is_not_resumed_on_server_key(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+
+    async def submit_then_restart():
+        queue = IllustrationJobQueue(db_path=db_path)
+        queue._spawn = lambda job_id: None  # keep the job queued, as if the server stopped first
+        job_id = await queue.submit(make_story(), api_key="sk-user")
+
+        restarted = IllustrationJobQueue(db_path=db_path)
+        await restarted.start()
+        await restarted.stop()
+        return restarted.get(job_id)
+
+    job = asyncio.run(submit_then_restart())
+    assert job.status == JOB_FAILED
+    assert job.error == OWN_KEY_LOST_ERROR
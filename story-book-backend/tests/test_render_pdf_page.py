@@ -0,0 +1,33 @@
+import fitz
+
+from app.storybook.pdf_extractor import RENDER_MAX_WIDTH, render_pdf_page
+
+
+def make_pdf(path, width: float, height: float):
+    doc = fitz.open()
+    page = doc.new_page(width=width, height=height)
+    page.insert_text((72, 72), "Once upon a time")
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_large_page_is_clamped_at_any_dpi(tmp_path):
+    # A 5 m tall page at 300 dpi would be about 59000 pixels high
+    pdf_path = make_pdf(tmp_path / "poster.pdf", 612, 14400)
+    rendered = render_pdf_page(pdf_path, 0, dpi=300, image_format="jpeg")
+    assert rendered["height"] <= RENDER_MAX_WIDTH
+    assert rendered["width"] <= RENDER_MAX_WIDTH
+
+
+def test_width_request_is_clamped_by_height(tmp_path):
+    pdf_path = make_pdf(tmp_path / "tall.pdf", 300, 6000)
+    rendered = render_pdf_page(pdf_path, 0, width=1200, image_format="jpeg")
+    assert rendered["height"] <= RENDER_MAX_WIDTH
+    assert rendered["width"] < 1200
+
+
+def test_normal_page_keeps_requested_dpi(tmp_path):
+    pdf_path = make_pdf(tmp_path / "letter.pdf", 612, 792)
+    rendered = render_pdf_page(pdf_path, 0, dpi=144, image_format="png")
+    assert (rendered["width"], rendered["height"]) == (1224, 1584)
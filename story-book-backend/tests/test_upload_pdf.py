@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.storybook.pdf_uploads import pdf_upload_store
+
+SAMPLE_PDF = Path(__file__).resolve().parent.parent / "sample" / "sample_storybook.pdf"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def upload(client, content: bytes, filename: str = "sample_storybook.pdf", **params):
+    return client.post(
+        "/storybook/upload-pdf",
+        params=params,
+        files={"file": (filename, content, "application/pdf")},
+    )
+
+
+def test_lazy_upload_then_fetch_page(client):
+    response = upload(client, SAMPLE_PDF.read_bytes(), lazy="true")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["id"] == "sample_storybook"
+    assert data["pages"] == []
+    assert data["totalPages"] > 0
+
+    page = client.get(f"/storybook/uploads/{data['documentId']}/pages/1", params={"images": "url"})
+    assert page.status_code == 200, page.text
+    assert page.json()["page"]["id"] == 1
+
+
+def test_reupload_reuses_stored_pdf(client):
+    first = upload(client, SAMPLE_PDF.read_bytes(), lazy="true").json()
+    second = upload(client, SAMPLE_PDF.read_bytes(), filename="renamed.pdf", lazy="true").json()
+    assert second["documentId"] == first["documentId"]
+    assert second["id"] == "renamed"
+    assert len(list(pdf_upload_store.upload_dir.glob("*.pdf"))) == 1
+
+
+def test_rejects_non_pdf(client):
+    response = upload(client, b"hello, not a pdf")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Uploaded file is not a PDF"
+
+
+def test_rejects_missing_file_field(client):
+    response = client.post("/storybook/upload-pdf", files={"document": ("a.pdf", b"%PDF-1.7", "application/pdf")})
+    assert response.status_code == 400
+
+
+def test_rejects_oversized_upload(client, monkeypatch):
+    monkeypatch.setattr(pdf_upload_store.config, "max_bytes", 1024)
+    content = b"%PDF-1.7\n" + b"0" * (200 * 1024)
+
+    # Content-Length over the limit is rejected before the body is parsed
+    assert upload(client, content).status_code == 413
+
+    # Without Content-Length (chunked) the body is cut off once it crosses the limit
+    boundary = "storybook-test-boundary"
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="big.pdf"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    chunks = (body[i:i + 8192] for i in range(0, len(body), 8192))
+    response = client.post(
+        "/storybook/upload-pdf",
+        content=chunks,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    assert response.status_code == 413